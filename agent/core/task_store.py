@@ -10,48 +10,246 @@ Concurrency model:
   - READS (load_tasks) are lock-free. This is safe because save_tasks uses
     atomic rename (tmp.replace), so readers see either the old or new version,
     never a partial write. Reads may be slightly stale but never corrupt.
+  - READS are cached: load_tasks re-parses only when the file's stat key
+    (inode, size, mtime) changes, so the dispatcher's polling loop and the web
+    UI's AJAX polls cost one stat() while tasks.json is quiescent. The cached
+    dict is shared — callers must treat it as read-only. locked_update always
+    re-reads under the lock and hands mutate_fn a private copy.
   - The lock file (.lock) is intentionally never deleted. Deleting it between
     operations creates a TOCTOU race: two processes could create separate
     lock files on different inodes and both acquire "exclusive" locks.
 """
 
 import fcntl
+import gzip
 import json
 import os
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # stdlib fallback — identical JSON on disk, just slower
+    orjson = None
+
 _DEFAULT_TASKS = str(Path(__file__).resolve().parent.parent.parent / "tasks.json")
 TASKS_FILE = Path(os.environ.get("TASKS_FILE", _DEFAULT_TASKS))
 STATUS_FILE = TASKS_FILE.parent / "agent_log" / "dispatcher_status.json"
 DEFAULT_ACCOUNT = "personal"
+# fsync the tmp file before the rename. Off by default: the rename alone
+# already guarantees readers never see a torn file, and durability across
+# power loss isn't worth an fsync on every state transition.
+TASKS_FSYNC = os.environ.get("TASKS_FSYNC", "") == "1"
+# Indented tasks.json for hand inspection. Off by default: indentation roughly
+# doubles the file and slows the stdlib serializer on every save.
+TASKS_PRETTY = os.environ.get("TASKS_PRETTY", "") == "1"
+# Opt-in: move long-finished task trees out of tasks.json into a compressed,
+# append-only JSONL archive (see archive_completed). Off = single-file mode.
+ARCHIVE_ENABLED = os.environ.get("AGENT_ARCHIVE", "") == "1"
+# Days a done task stays in tasks.json before it can be archived. Minimum 1,
+# so today's completions (the digest's view) are always still active.
+ARCHIVE_AFTER_DAYS = max(1, int(os.environ.get("ARCHIVE_AFTER_DAYS", "7")))
+# Longest free-text field (summary, plan, feedback) kept inline in tasks.json.
+# Every load/save pays for these bytes; the full text lives in the artifacts.
+MAX_TEXT_CHARS = int(os.environ.get("TASK_TEXT_MAX_CHARS", "16384"))
+
+# Parsed tasks.json keyed by the stat fields that change on every write.
+# The path is part of the key so tests that monkeypatch TASKS_FILE never
+# see another file's data. The inode catches atomic-rename replacements
+# even when size and mtime happen to collide. "index" is the {id: task} map
+# for "data", built lazily by load_tasks_indexed() and dropped with the entry.
+_TASKS_CACHE = {"key": None, "data": None, "index": None, "children": None}
+
+
+def _stat_key(st: os.stat_result) -> tuple:
+    return (str(TASKS_FILE), st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _loads(raw: bytes):
+    """Parse JSON bytes with orjson when available.
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    catch the same exception either way."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dumps(data: dict) -> bytes:
+    """Serialize to JSON bytes — compact, or indented when TASKS_PRETTY=1."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if TASKS_PRETTY else 0)
+    if TASKS_PRETTY:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def _read_snapshot() -> tuple[os.stat_result, bytes]:
+    """Open tasks.json once; return its fstat and full contents.
+
+    Unbuffered binary read: FileIO.readall sizes its buffer from fstat, so
+    the whole file arrives in one read() with no decode or copy through a
+    BufferedReader. The stat comes from the same open file, so a cache key
+    built from it always matches the bytes that were parsed, even if a
+    writer renames a new tasks.json into place mid-read.
+    """
+    with open(TASKS_FILE, "rb", buffering=0) as f:
+        return os.fstat(f.fileno()), f.readall()
+
+
+def _read_tasks() -> dict:
+    """Read and parse tasks.json unconditionally, bypassing the cache."""
+    try:
+        _, raw = _read_snapshot()
+    except FileNotFoundError:
+        return {"tasks": []}
+    return _loads(raw)
 
 
 def load_tasks() -> dict:
-    """Read tasks.json, returning empty structure if missing."""
-    if not TASKS_FILE.exists():
+    """Read tasks.json, returning empty structure if missing.
+
+    Returns the cached parse when the file is unchanged since the last call.
+    The returned dict may be shared with other callers — do not mutate it;
+    use locked_update() for writes.
+    """
+    try:
+        st = TASKS_FILE.stat()
+        if _TASKS_CACHE["key"] == _stat_key(st):
+            return _TASKS_CACHE["data"]
+        st, raw = _read_snapshot()
+    except FileNotFoundError:
+        # Forget the vanished file, so wait_for_change watches for it to
+        # reappear instead of comparing against a key that can't recur.
+        _TASKS_CACHE["key"] = None
         return {"tasks": []}
-    return json.loads(TASKS_FILE.read_text())
+    data = _loads(raw)
+    _TASKS_CACHE["key"] = _stat_key(st)
+    _TASKS_CACHE["data"] = data
+    _TASKS_CACHE["index"] = None
+    _TASKS_CACHE["children"] = None
+    return data
+
+
+def load_tasks_indexed() -> tuple[dict, dict]:
+    """Return (data, {id: task}) for read-only lookups.
+
+    The index is built once per cache entry, so repeated by-id lookups on an
+    unchanged tasks.json are O(1) instead of a scan per call. Same read-only
+    contract as load_tasks().
+    """
+    data = load_tasks()
+    if _TASKS_CACHE["data"] is not data:
+        # Missing file — nothing cached to attach the index to.
+        return data, {t["id"]: t for t in data["tasks"]}
+    if _TASKS_CACHE["index"] is None:
+        _TASKS_CACHE["index"] = {t["id"]: t for t in data["tasks"]}
+    return data, _TASKS_CACHE["index"]
+
+
+def load_children_index() -> dict:
+    """Return {parent_id: [child tasks]} for read-only lookups.
+
+    Built in one pass per cache entry, alongside load_tasks_indexed()'s id
+    index; children keep tasks.json order. Same read-only contract.
+    """
+    data = load_tasks()
+    cached = _TASKS_CACHE["data"] is data
+    if cached and _TASKS_CACHE["children"] is not None:
+        return _TASKS_CACHE["children"]
+    children = {}
+    for t in data["tasks"]:
+        parent = t.get("parent")
+        if parent is not None:
+            children.setdefault(parent, []).append(t)
+    if cached:
+        _TASKS_CACHE["children"] = children
+    return children
+
+
+def wait_for_change(timeout: float, poll_interval: float = 1.0) -> bool:
+    """Block until tasks.json differs from the last load_tasks() view, or timeout.
+
+    Returns True as soon as a change is seen, False on timeout. Each check is
+    a single stat() (no read or parse), so an idle dispatcher can react to a
+    new task or a web-UI approval within poll_interval instead of sleeping
+    out a fixed interval. Every writer renames a fresh file into place, so a
+    change always shows up as a new inode.
+    """
+    def current_key():
+        try:
+            return _stat_key(TASKS_FILE.stat())
+        except FileNotFoundError:
+            return None
+
+    seen = _TASKS_CACHE["key"]
+    if seen is None or seen[0] != str(TASKS_FILE):
+        seen = current_key()
+    deadline = time.monotonic() + timeout
+    while True:
+        if current_key() != seen:
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(poll_interval, remaining))
+
+
+def tasks_etag() -> str:
+    """Opaque validator for tasks.json, for HTTP conditional responses.
+
+    Built from the same (inode, size, mtime) stat as the read cache, so it
+    changes on every save.
+    """
+    try:
+        st = TASKS_FILE.stat()
+    except FileNotFoundError:
+        return "none"
+    return f"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+
+
+# fdatasync skips the inode-metadata flush (mtime etc.) that fsync forces;
+# the contents are all a rename needs. Not available on macOS.
+_datasync = getattr(os, "fdatasync", os.fsync)
 
 
 def save_tasks(data: dict) -> None:
     """Write tasks.json atomically via write-to-tmp + rename.
 
-    The rename (Path.replace) is atomic on POSIX, so concurrent readers
-    via load_tasks() never see a half-written file.
+    The payload is serialized once and written with a single os.write, then
+    os.replace swaps it into place. The rename is atomic on POSIX, so
+    concurrent readers via load_tasks() never see a half-written file.
+    Afterwards the cache is pointed at `data` under the post-rename stat key,
+    so our own next load_tasks() is a stat() with no re-parse.
     NOTE: This should only be called under the exclusive lock held by
     locked_update(). Calling it directly risks lost-update races.
     """
     tmp = TASKS_FILE.with_suffix(".tmp")
-    content = json.dumps(data, indent=2)
-    tmp.write_text(content)
-    tmp.replace(TASKS_FILE)
+    payload = _dumps(data)
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        if TASKS_FSYNC:
+            _datasync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, TASKS_FILE)
+    _TASKS_CACHE["key"] = _stat_key(TASKS_FILE.stat())
+    _TASKS_CACHE["data"] = data
+    _TASKS_CACHE["index"] = None
+    _TASKS_CACHE["children"] = None
 
 
 def locked_update(mutate_fn) -> dict:
     """Read tasks.json under an exclusive lock, apply mutate_fn, save, and return the data.
 
-    mutate_fn receives the full data dict and should modify it in place.
+    mutate_fn receives the full data dict and should modify it in place. It
+    may return False to report that it changed nothing, in which case the
+    file is not rewritten (and the returned dict is not cached).
     This prevents lost-update race conditions between dispatcher and web_manager.
+    The returned dict becomes the load_tasks() cache entry — treat it as read-only.
 
     Locking strategy:
       1. Acquire exclusive flock on a separate .lock file (not tasks.json itself,
@@ -66,8 +264,9 @@ def locked_update(mutate_fn) -> dict:
     with open(lock_path, "r") as lock_fd:
         fcntl.flock(lock_fd, fcntl.LOCK_EX)
         try:
-            data = load_tasks()
-            mutate_fn(data)
+            data = _read_tasks()
+            if mutate_fn(data) is False:
+                return data  # mutate_fn reported no change — skip the write
             save_tasks(data)
             return data
         finally:
@@ -92,3 +291,80 @@ def next_id(data: dict) -> int:
         nid = max((t["id"] for t in data["tasks"]), default=0) + 1
     data["next_id"] = nid + 1
     return nid
+
+
+def clip_text(text: str, limit: int | None = None) -> str:
+    """Return text cut to at most limit chars (default MAX_TEXT_CHARS).
+
+    Keeps the head and ends with a marker saying how much was dropped, so a
+    clipped field is never mistaken for the whole thing."""
+    limit = MAX_TEXT_CHARS if limit is None else limit
+    if len(text) <= limit:
+        return text
+    marker = f"\n… [truncated {len(text) - limit} chars]"
+    return text[:max(0, limit - len(marker))] + marker
+
+
+# ---------------------------------------------------------------------------
+# Archive — opt-in via AGENT_ARCHIVE=1
+# ---------------------------------------------------------------------------
+
+def archive_path() -> Path:
+    """Archive file next to TASKS_FILE. Always gzip (stdlib), so the file name
+    never depends on which optional packages are installed. Each append is its
+    own gzip member, which `zcat` and gzip.open read back as one stream."""
+    return TASKS_FILE.with_name(TASKS_FILE.stem + ".archive.jsonl.gz")
+
+
+def _append_archive(tasks: list) -> None:
+    payload = b"".join(_dumps_line(t) for t in tasks)
+    with gzip.open(archive_path(), "ab") as f:
+        f.write(payload)
+
+
+def _dumps_line(task: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(task) + b"\n"
+    return json.dumps(task).encode() + b"\n"
+
+
+def archive_completed(older_than_days: int = ARCHIVE_AFTER_DAYS) -> int:
+    """Move done tasks finished more than older_than_days ago to the archive,
+    along with decomposed parents whose whole subtree qualifies.
+
+    Whole trees only: a task leaves tasks.json together with its parent and
+    all its children, so rollups and the board never see half an archived
+    tree. The archive is appended inside the lock before tasks.json is saved —
+    a crash in between can duplicate an archive record but never lose a task.
+    Returns the number of tasks archived.
+    """
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=max(1, older_than_days))).isoformat(timespec="seconds")
+    moved = 0
+
+    def mutate(data):
+        nonlocal moved
+        by_id = {t["id"]: t for t in data["tasks"]}
+        # A decomposed parent never reaches "done": it is finished once its
+        # rollup report is set, and is old enough once all its children are.
+        gone = {t["id"] for t in data["tasks"]
+                if t["status"] == "done" and t.get("completed_at") and t["completed_at"] < cutoff
+                or t["status"] == "decomposed" and t.get("report") and t.get("children")}
+        # Drop tasks whose parent or any child stays behind, until stable
+        while True:
+            stay = {i for i in gone
+                    if by_id[i].get("parent") in by_id and by_id[i]["parent"] not in gone
+                    or any(c in by_id and c not in gone for c in by_id[i].get("children") or [])}
+            if not stay:
+                break
+            gone -= stay
+        if not gone:
+            return False
+        # Pin the id counter before the highest ids can leave the file
+        if "next_id" not in data:
+            data["next_id"] = max(by_id) + 1
+        _append_archive([t for t in data["tasks"] if t["id"] in gone])
+        data["tasks"] = [t for t in data["tasks"] if t["id"] not in gone]
+        moved = len(gone)
+
+    locked_update(mutate)
+    return moved
@@ -14,14 +14,26 @@ SMTP credentials come from agent/.env (never mounted into Docker, never in CC co
 
 import json
 import os
-import smtplib
+import re
+import sys
 from datetime import date
 from email.message import EmailMessage
 from pathlib import Path
 
+from smtp_pool import get_pool
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback — the digest runs fine without it
+    orjson = None
+
 _AGENT_DIR = Path(__file__).resolve().parent
 TASKS_FILE = Path(os.environ.get("TASKS_FILE", str(_AGENT_DIR.parent / "tasks.json")))
 
+# One KEY=value per line; comment lines (leading '#') and lines without '='
+# never match. Key and value are whitespace-trimmed, value split on the first '='.
+_ENV_RE = re.compile(r"(?m)^[ \t]*([^#\s=][^=\n]*?)[ \t]*=[ \t]*(.*?)[ \t\r]*$")
+
 
 def load_env_file(path: str = "") -> None:
     """Load key=value pairs from .env into os.environ.
@@ -34,22 +46,73 @@ def load_env_file(path: str = "") -> None:
     if not path:
         path = str(_AGENT_DIR / ".env")
     try:
-        for line in Path(path).read_text().splitlines():
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                key, _, val = line.partition("=")
-                val = val.strip()
-                # Strip surrounding quotes (single or double) from values
-                if len(val) >= 2 and val[0] == val[-1] and val[0] in ('"', "'"):
-                    val = val[1:-1]
-                os.environ.setdefault(key.strip(), val)
+        text = Path(path).read_text()
     except FileNotFoundError:
-        pass
+        return
+    for m in _ENV_RE.finditer(text):
+        key, val = m.groups()
+        # Strip surrounding quotes (single or double) from values
+        if len(val) >= 2 and val[0] == val[-1] and val[0] in ('"', "'"):
+            val = val[1:-1]
+        os.environ.setdefault(key, val)
+
+
+def classify_tasks(tasks: list, today: str) -> tuple[list, list, list]:
+    """Split tasks into (done today, pending, failed) buckets in a single pass.
+
+    Same filters as the digest sections: done is date-filtered by completed_at,
+    pending and failed (status "stopped") are not — see build_body.
+    """
+    done, pending, failed = [], [], []
+    for t in tasks:
+        status = t["status"]
+        if status == "pending":
+            pending.append(t)
+        elif status == "done":
+            if (t.get("completed_at") or "").startswith(today):
+                done.append(t)
+        elif status == "stopped":
+            failed.append(t)
+    return done, pending, failed
+
+
+def load_tasks() -> dict:
+    """Return the parsed tasks.json ({"tasks": [...]}).
+
+    When task_store is already loaded in this process (the digest running
+    alongside the dispatcher) and points at the same file, its cached view is
+    reused instead of parsing the file again. Standalone cron runs never
+    import task_store and parse the file themselves.
+    """
+    store = sys.modules.get("task_store")
+    if store is not None and Path(store.TASKS_FILE) == TASKS_FILE:
+        return store.load_tasks()
+    if not TASKS_FILE.exists():
+        return {"tasks": []}
+    raw = TASKS_FILE.read_bytes()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
 
 
-def build_body(tasks: list, today: str) -> str:
+def _task_row(t: dict) -> str:
+    return f"  #{t['id']} — {t['prompt'][:70]}"
+
+
+def _failed_row(t: dict) -> str:
+    reason = (t.get("stop_reason") or t.get("summary") or "")[:80]
+    return f"  #{t['id']} — {t['prompt'][:60]}{(' (' + reason + ')') if reason else ''}"
+
+
+def _section(rows) -> str:
+    """Join one section's rows, or "(none)" for an empty bucket."""
+    return "\n".join(rows) or "  (none)"
+
+
+def build_body(tasks: list, today: str) -> tuple[str, dict[str, int]]:
     """Build the plain-text email body with three sections plus a session stats footer.
 
+    Returns (body, counts) where counts holds the section sizes
+    ({"done", "pending", "failed"}) so the subject line reuses the same pass.
+
     Sections:
       - Completed: tasks done today (filtered by completed_at date)
       - Pending: all currently-pending tasks (always shown for awareness)
@@ -59,32 +122,7 @@ def build_body(tasks: list, today: str) -> str:
       - Stats: session count, rate-limit hits, avg duration — filtered to today's
         sessions by started_at date prefix.
     """
-    done    = [t for t in tasks if t["status"] == "done"    and (t.get("completed_at") or "").startswith(today)]
-    pending = [t for t in tasks if t["status"] == "pending"]
-    failed  = [t for t in tasks if t["status"] == "stopped"]
-
-    lines = []
-
-    lines.append(f"✓ Completed ({len(done)}):")
-    for t in done:
-        lines.append(f"  #{t['id']} — {t['prompt'][:70]}")
-    if not done:
-        lines.append("  (none)")
-
-    lines.append("")
-    lines.append(f"⏳ Pending ({len(pending)}):")
-    for t in pending:
-        lines.append(f"  #{t['id']} — {t['prompt'][:70]}")
-    if not pending:
-        lines.append("  (none)")
-
-    lines.append("")
-    lines.append(f"✗ Failed ({len(failed)}):")
-    for t in failed:
-        reason = (t.get("stop_reason") or t.get("summary") or "")[:80]
-        lines.append(f"  #{t['id']} — {t['prompt'][:60]}{(' (' + reason + ')') if reason else ''}")
-    if not failed:
-        lines.append("  (none)")
+    done, pending, failed = classify_tasks(tasks, today)
 
     # Session stats: only today's sessions (filtered by started_at date prefix)
     today_sessions = [
@@ -99,20 +137,24 @@ def build_body(tasks: list, today: str) -> str:
     else:
         avg_str = "n/a"
 
-    lines.append("")
-    lines.append(f"📊 Sessions today: {len(today_sessions)}  |  Rate limits: {rate_limit_count}  |  Avg duration: {avg_str}")
-
-    return "\n".join(lines)
+    body = (
+        f"✓ Completed ({len(done)}):\n{_section(map(_task_row, done))}\n\n"
+        f"⏳ Pending ({len(pending)}):\n{_section(map(_task_row, pending))}\n\n"
+        f"✗ Failed ({len(failed)}):\n{_section(map(_failed_row, failed))}\n\n"
+        f"📊 Sessions today: {len(today_sessions)}  |  Rate limits: {rate_limit_count}  |  Avg duration: {avg_str}"
+    )
+    return body, {"done": len(done), "pending": len(pending), "failed": len(failed)}
 
 
 def send_digest() -> None:
     """Build and send the daily digest email via SMTP.
 
-    Flow: load .env credentials → read tasks.json → build body → send via STARTTLS.
+    Flow: load .env credentials → read tasks.json → build body → send via the
+    shared STARTTLS connection from smtp_pool (closed at process exit).
     Silently exits if SMTP_USER or SMTP_PASSWORD are not set (allows running
     the cron job on machines without email configured).
-    Reads tasks.json directly (not via task_store) so the digest can run
-    standalone without the agent's sys.path setup.
+    Reads tasks.json via load_tasks(), which never imports task_store, so the
+    digest can run standalone without the agent's sys.path setup.
     """
     load_env_file()
 
@@ -127,13 +169,10 @@ def send_digest() -> None:
         return
 
     today = date.today().isoformat()
-    data = json.loads(TASKS_FILE.read_text()) if TASKS_FILE.exists() else {"tasks": []}
-    tasks = data["tasks"]
+    tasks = load_tasks()["tasks"]
 
-    body = build_body(tasks, today)
-    done_count    = sum(1 for t in tasks if t["status"] == "done"    and (t.get("completed_at") or "").startswith(today))
-    pending_count = sum(1 for t in tasks if t["status"] == "pending")
-    subject = f"Agent Daily Report — {done_count} done, {pending_count} pending [{today}]"
+    body, counts = build_body(tasks, today)
+    subject = f"Agent Daily Report — {counts['done']} done, {counts['pending']} pending [{today}]"
 
     msg = EmailMessage()
     msg["Subject"] = subject
@@ -141,10 +180,7 @@ def send_digest() -> None:
     msg["To"] = digest_to
     msg.set_content(body)
 
-    with smtplib.SMTP(smtp_host, smtp_port) as server:
-        server.starttls()
-        server.login(smtp_user, smtp_pass)
-        server.send_message(msg)
+    get_pool(smtp_host, smtp_port, smtp_user, smtp_pass).send_message(msg)
 
     print(f"[digest] Sent: {subject}")
 
@@ -10,15 +10,23 @@ import os
 import re
 import sys
 import subprocess
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # stdlib fallback for the status file
+    orjson = None
+
 _AGENT_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(_AGENT_DIR / "core"))
 
 from progress_logger import log_progress
-from task_store import load_tasks, save_tasks, locked_update, next_id, TASKS_FILE, STATUS_FILE, DEFAULT_ACCOUNT
+from task_store import load_tasks, load_tasks_indexed, locked_update, next_id, clip_text, wait_for_change, archive_completed, ARCHIVE_ENABLED, TASKS_FILE, STATUS_FILE, DEFAULT_ACCOUNT
 
 _DEFAULT_WORKSPACE = str(Path(__file__).resolve().parent.parent.parent)
 WORKSPACE = os.environ.get("WORKSPACE", _DEFAULT_WORKSPACE)
@@ -37,6 +45,11 @@ TOKEN_BACKOFF_SECONDS = int(os.environ.get("TOKEN_BACKOFF_SECONDS", "3600"))
 MAX_SUB_TASK_DEPTH = int(os.environ.get("MAX_SUB_TASK_DEPTH", "9"))
 MAX_RETRIES = int(os.environ.get("MAX_RETRIES", "3"))
 TIMEOUT_SECONDS = int(os.environ.get("TIMEOUT_SECONDS", "3600"))
+# Characters of raw CC output kept in memory while streaming — only used as
+# the fallback when nothing in the stream parses (see _run_cc_streaming).
+CC_TAIL_CHARS = int(os.environ.get("CC_TAIL_CHARS", "16000"))
+# Workspace repos pushed concurrently by push_workspace_repos.
+PUSH_WORKERS = max(1, int(os.environ.get("PUSH_WORKERS", "4")))
 
 # Docker settings for sandboxed execution
 DOCKER_IMAGE = os.environ.get("DOCKER_IMAGE", "claude-agent:latest")
@@ -64,7 +77,7 @@ def write_status(state: str, label: str, task_id: int | None = None) -> None:
     if task_id is not None:
         status["task_id"] = task_id
     try:
-        STATUS_FILE.write_text(json.dumps(status))
+        STATUS_FILE.write_bytes(orjson.dumps(status) if orjson is not None else json.dumps(status).encode())
     except OSError:
         pass
 
@@ -73,18 +86,46 @@ def write_status(state: str, label: str, task_id: int | None = None) -> None:
 # Task helpers
 # ---------------------------------------------------------------------------
 
-def update_task(task_id: int, progress_action: str = "", progress_details: str = "", **kwargs) -> None:
+def _iso(dt: datetime) -> str:
+    """Serialize a UTC datetime for tasks.json — second precision, offset included."""
+    return dt.isoformat(timespec="seconds")
+
+
+def _utc_now_iso() -> str:
+    return _iso(datetime.now(timezone.utc))
+
+
+def _find_task(data: dict, task_id: int) -> dict | None:
+    """Return the task with the given id from a loaded data dict, or None."""
+    return next((t for t in data["tasks"] if t["id"] == task_id), None)
+
+
+def _append_session(task: dict, session: dict) -> None:
+    """Append a run record to task["sessions"], repairing a missing/legacy field."""
+    if not isinstance(task.get("sessions"), list):
+        task["sessions"] = []
+    task["sessions"].append(session)
+
+
+def update_task(task_id: int, progress_action: str = "", progress_details: str = "",
+                session: dict | None = None, **kwargs) -> None:
     """Atomically update a task's fields and optionally log the change.
 
+    If `session` is given it is appended to task["sessions"] in the same
+    locked pass, so a CC run's bookkeeping and the status transition it
+    causes cost one tasks.json round-trip instead of two.
+
     Uses locked_update for the file mutation, then appends to the progress log
     outside the lock. The two operations are NOT atomic with each other — if the
     process crashes between them the task changes but the log entry is lost.
     This is acceptable: the progress log is informational only."""
     def mutate(data):
-        for t in data["tasks"]:
-            if t["id"] == task_id:
-                t.update(kwargs)
-                break
+        t = _find_task(data, task_id)
+        if t is None:
+            return
+        if session is not None:
+            _append_session(t, session)
+        t.update(kwargs)
 
     locked_update(mutate)
     if progress_action:
@@ -92,25 +133,25 @@ def update_task(task_id: int, progress_action: str = "", progress_details: str =
 
 
 def _priority_key(t: dict) -> tuple:
-    return (PRIORITY_ORDER.get(t.get("priority", "medium"), 1), t["id"])
+    # Missing or unknown priority ranks as medium (1)
+    p = t.get("priority")
+    return (PRIORITY_ORDER[p] if p in PRIORITY_ORDER else 1, t["id"])
 
 
 def pick_next_task(tasks: list) -> dict | None:
     """Pick the highest-priority pending task that isn't blocked.
-    Sorts by (priority rank, id) so high-priority tasks run first,
+    Minimum by (priority rank, id) so high-priority tasks run first,
     and ties are broken by lowest id (oldest task first)."""
-    pending = [t for t in tasks if t["status"] == "pending" and not t.get("blocked_on")]
-    if not pending:
-        return None
-    return sorted(pending, key=_priority_key)[0]
+    return min(
+        (t for t in tasks if t["status"] == "pending" and not t.get("blocked_on")),
+        key=_priority_key,
+        default=None,
+    )
 
 
 def pick_approved_task(tasks: list) -> dict | None:
     """Find a task that was approved (executing) and ready for Docker execution."""
-    approved = [t for t in tasks if t["status"] == "executing"]
-    if not approved:
-        return None
-    return sorted(approved, key=_priority_key)[0]
+    return min((t for t in tasks if t["status"] == "executing"), key=_priority_key, default=None)
 
 
 TOKEN_LIMIT_PATTERNS = [
@@ -140,17 +181,14 @@ def is_token_limit_error(output: str) -> bool:
 # Claude Code runner
 # ---------------------------------------------------------------------------
 
-def parse_stream_json(raw: str) -> str:
-    """
-    Extract human-readable text from Claude Code's stream-json output.
-
-    CC's --output-format stream-json emits one JSON object per line.
-    Priority: 'result' object (final answer) > concatenated assistant text blocks > raw string.
-    """
+def _parse_stream_lines(lines) -> str | None:
+    """Parse stream-json lines; return the human-readable text, or None if
+    nothing in the stream was recognized. Consumes lines lazily, so it works
+    on a live pipe as well as on a captured string's splitlines()."""
     text_blocks = []
     result_text = None
 
-    for line in raw.splitlines():
+    for line in lines:
         line = line.strip()
         if not line:
             continue
@@ -173,7 +211,17 @@ def parse_stream_json(raw: str) -> str:
         return result_text
     if text_blocks:
         return "\n\n".join(text_blocks)
-    return raw  # fallback: return raw if nothing parsed
+    return None
+
+
+def parse_stream_json(raw: str) -> str:
+    """
+    Extract human-readable text from Claude Code's stream-json output.
+
+    CC's --output-format stream-json emits one JSON object per line.
+    Priority: 'result' object (final answer) > concatenated assistant text blocks > raw string.
+    """
+    return _parse_stream_lines(raw.splitlines()) or raw  # fallback: raw if nothing parsed
 
 
 def build_plan_prompt(prompt: str, rejection_comments: list | None = None, title: str | None = None) -> str:
@@ -378,6 +426,14 @@ def parse_result_artifacts(output: str) -> dict:
                 a for a in raw_artifacts
                 if isinstance(a, dict) and a.get("type") in _VALID_ARTIFACT_TYPES
             ]
+            # Inline contents are stored in tasks.json; documents move to files
+            # (_materialize_document_artifacts) so they keep their full text.
+            for a in artifacts:
+                if a["type"] == "document":
+                    continue
+                for key in ("content", "diff"):
+                    if isinstance(a.get(key), str):
+                        a[key] = clip_text(a[key])
             return {"summary": str(obj["summary"]), "artifacts": artifacts}
     except (json.JSONDecodeError, ValueError):
         pass
@@ -385,6 +441,61 @@ def parse_result_artifacts(output: str) -> dict:
     return {"summary": fallback, "artifacts": []}
 
 
+def _run_cc_streaming(cmd: list, cwd: str | None = None,
+                      tail_chars: int | None = CC_TAIL_CHARS) -> tuple[int, str]:
+    """
+    Run a CC command and parse its stream-json output as it arrives.
+
+    stdout and stderr are merged and read line by line, so memory stays flat
+    for hour-long runs: only the parsed text and the last tail_chars of raw
+    output (the fallback when nothing parses) are kept. tail_chars=None keeps
+    the full raw output. TIMEOUT_SECONDS is enforced by a timer that kills the
+    process; raises subprocess.TimeoutExpired like subprocess.run(timeout=...)
+    so callers' handling is unchanged.
+    """
+    tail = deque()
+    tail_len = 0
+    timed_out = threading.Event()
+
+    with subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+    ) as proc:
+        def _kill():
+            timed_out.set()
+            proc.kill()
+
+        def _tee():
+            nonlocal tail_len
+            for line in proc.stdout:
+                tail.append(line)
+                tail_len += len(line)
+                # Drop whole lines from the left while the rest still covers the budget
+                while tail_chars is not None and tail_len - len(tail[0]) >= tail_chars:
+                    tail_len -= len(tail.popleft())
+                yield line
+
+        timer = threading.Timer(TIMEOUT_SECONDS, _kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            text = _parse_stream_lines(_tee())
+            returncode = proc.wait()
+        finally:
+            timer.cancel()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, TIMEOUT_SECONDS)
+    if text:
+        return returncode, text
+    raw = "".join(tail)
+    return returncode, raw[-tail_chars:] if tail_chars is not None else raw
+
+
 def run_cc_local(prompt: str, model: str = DEFAULT_MODEL) -> tuple[int, str]:
     """
     Run Claude Code locally in plan mode (read-only, safe).
@@ -400,15 +511,7 @@ def run_cc_local(prompt: str, model: str = DEFAULT_MODEL) -> tuple[int, str]:
     ]
 
     print("[dispatcher] Running CC locally (plan mode)...", flush=True)
-    result = subprocess.run(
-        cmd,
-        cwd=WORKSPACE,
-        capture_output=True,
-        text=True,
-        timeout=TIMEOUT_SECONDS,
-    )
-    raw = result.stdout + result.stderr
-    return result.returncode, parse_stream_json(raw)
+    return _run_cc_streaming(cmd, cwd=WORKSPACE)
 
 
 def run_cc_docker(prompt: str, task_id: int, model: str = DEFAULT_MODEL) -> tuple[int, str]:
@@ -482,14 +585,7 @@ def run_cc_docker(prompt: str, task_id: int, model: str = DEFAULT_MODEL) -> tupl
     docker_cmd += ["-w", "/workspace", DOCKER_IMAGE] + cc_cmd
 
     print(f"[dispatcher] Running CC in Docker ({DOCKER_IMAGE})...", flush=True)
-    result = subprocess.run(
-        docker_cmd,
-        capture_output=True,
-        text=True,
-        timeout=TIMEOUT_SECONDS,
-    )
-    raw = result.stdout + result.stderr
-    return result.returncode, parse_stream_json(raw)
+    return _run_cc_streaming(docker_cmd)
 
 
 # ---------------------------------------------------------------------------
@@ -546,11 +642,43 @@ def git_commit(message: str) -> bool:
     return True
 
 
+def _push_repo(repo_dir: Path, gh_token: str) -> str | None:
+    """Push one repo if it has commits ahead of upstream on a GitHub origin.
+    Returns a log line, or None when there was nothing to do."""
+    # Check commits ahead of upstream; skip if none or no upstream set.
+    ahead = subprocess.run(
+        ["git", "rev-list", "--count", "@{u}..HEAD"],
+        cwd=repo_dir, capture_output=True, text=True,
+    )
+    if ahead.returncode != 0 or ahead.stdout.strip() == "0":
+        return None
+
+    remote_url = subprocess.run(
+        ["git", "remote", "get-url", "origin"],
+        cwd=repo_dir, capture_output=True, text=True,
+    )
+    if remote_url.returncode != 0 or "github.com" not in remote_url.stdout:
+        return None
+
+    # Inject token into URL — stays in memory only for this subprocess.
+    url = remote_url.stdout.strip()
+    auth_url = url.replace("https://", f"https://x-access-token:{gh_token}@")
+    push = subprocess.run(
+        ["git", "push", auth_url, "HEAD"],
+        cwd=repo_dir, capture_output=True, text=True,
+    )
+    if push.returncode == 0:
+        return f"[dispatcher] Pushed {repo_dir.name} to origin."
+    return f"[dispatcher] Push failed for {repo_dir.name}: {push.stderr.strip()[:200]}"
+
+
 def push_workspace_repos() -> None:
     """Push unpushed commits in all workspace repos (except ClaudeXingCode).
 
     Execution Claude is supposed to push after committing, but it's unreliable.
-    This runs after every task execution as a safety net.
+    This runs after every task execution as a safety net. Repos are handled
+    concurrently (PUSH_WORKERS at a time) since each push is a network
+    round-trip; log lines are printed in repo order once all finish.
     """
     gh_token = os.environ.get("GH_TOKEN", "")
     if not gh_token:
@@ -559,38 +687,16 @@ def push_workspace_repos() -> None:
     docker_mount = Path(DOCKER_MOUNT)
     skip_name = Path(WORKSPACE_REL).name  # e.g. "ClaudeXingCode"
 
-    for repo_dir in sorted(docker_mount.iterdir()):
-        if not repo_dir.is_dir() or repo_dir.name == skip_name:
-            continue
-        if not (repo_dir / ".git").exists():
-            continue
-
-        # Check commits ahead of upstream; skip if none or no upstream set.
-        ahead = subprocess.run(
-            ["git", "rev-list", "--count", "@{u}..HEAD"],
-            cwd=repo_dir, capture_output=True, text=True,
-        )
-        if ahead.returncode != 0 or ahead.stdout.strip() == "0":
-            continue
-
-        remote_url = subprocess.run(
-            ["git", "remote", "get-url", "origin"],
-            cwd=repo_dir, capture_output=True, text=True,
-        )
-        if remote_url.returncode != 0 or "github.com" not in remote_url.stdout:
-            continue
-
-        # Inject token into URL — stays in memory only for this subprocess.
-        url = remote_url.stdout.strip()
-        auth_url = url.replace("https://", f"https://x-access-token:{gh_token}@")
-        push = subprocess.run(
-            ["git", "push", auth_url, "HEAD"],
-            cwd=repo_dir, capture_output=True, text=True,
-        )
-        if push.returncode == 0:
-            print(f"[dispatcher] Pushed {repo_dir.name} to origin.", flush=True)
-        else:
-            print(f"[dispatcher] Push failed for {repo_dir.name}: {push.stderr.strip()[:200]}", flush=True)
+    repos = [
+        d for d in sorted(docker_mount.iterdir())
+        if d.is_dir() and d.name != skip_name and (d / ".git").exists()
+    ]
+    if not repos:
+        return
+    with ThreadPoolExecutor(max_workers=min(PUSH_WORKERS, len(repos))) as pool:
+        for line in pool.map(lambda d: _push_repo(d, gh_token), repos):
+            if line:
+                print(line, flush=True)
 
 
 def task_artifact_folder(task_id: int) -> Path:
@@ -602,8 +708,7 @@ def task_artifact_folder(task_id: int) -> Path:
 
     Walks the parent chain by loading tasks.json so the full ancestry is available.
     The folder is NOT created here — callers must mkdir as needed."""
-    data = load_tasks()
-    task_map = {t["id"]: t for t in data["tasks"]}
+    _, task_map = load_tasks_indexed()
 
     # Build ancestor chain from this task up to the root
     chain = []
@@ -689,8 +794,7 @@ def generate_parent_report(parent_id: int) -> None:
     """Collect children summaries, run CC locally to synthesize parent.report,
     write report.md to the artifact folder, and update parent.report in tasks.json.
     Best-effort: errors are logged but never re-raised."""
-    data = load_tasks()
-    task_map = {t["id"]: t for t in data["tasks"]}
+    _, task_map = load_tasks_indexed()
     parent = task_map.get(parent_id)
     if not parent:
         return
@@ -734,10 +838,9 @@ def generate_parent_report(parent_id: int) -> None:
 
     # Persist report to tasks.json
     def _set_report(data):
-        for t in data["tasks"]:
-            if t["id"] == parent_id:
-                t["report"] = report_text
-                break
+        t = _find_task(data, parent_id)
+        if t is not None:
+            t["report"] = clip_text(report_text)  # report.md keeps the full text
 
     locked_update(_set_report)
 
@@ -758,11 +861,21 @@ def pick_actionable_task(tasks: list) -> dict | None:
 
     Priority order ensures approved work (human already reviewed) is never
     starved by incoming pending tasks. This is the single scheduling entry
-    point called by the main loop — all routing decisions flow from here."""
-    approved = pick_approved_task(tasks)
-    if approved:
-        return approved
-    return pick_next_task(tasks)
+    point called by the main loop — all routing decisions flow from here.
+
+    Same result as pick_approved_task() falling back to pick_next_task(), but
+    in one pass with no intermediate lists or sorts — it runs on every loop
+    iteration over the full task history."""
+    best_approved = best_pending = None
+    for t in tasks:
+        status = t["status"]
+        if status == "executing":
+            if best_approved is None or _priority_key(t) < _priority_key(best_approved):
+                best_approved = t
+        elif best_approved is None and status == "pending" and not t.get("blocked_on"):
+            if best_pending is None or _priority_key(t) < _priority_key(best_pending):
+                best_pending = t
+    return best_approved or best_pending
 
 
 def main() -> None:
@@ -771,19 +884,29 @@ def main() -> None:
     Each iteration: load tasks -> pick highest-priority actionable task -> route it.
     Routing: tasks with an approved plan go to execute_task (Docker);
     tasks without a plan go to plan_task (local, read-only).
-    Sleeps 60s when no actionable tasks are found to avoid busy-waiting.
+    When no actionable tasks are found, blocks on wait_for_change for up to
+    60s, so a new task or a web-UI approval is picked up within a second
+    instead of after a fixed sleep. Idle wakeups that find tasks.json
+    unchanged (load_tasks returns the same cached object) skip the rescan.
     """
     print("[dispatcher] Ralph Loop starting...", flush=True)
     write_status("idle", "Idle")
 
+    idle_view = None  # the tasks view last scanned with nothing actionable
     while True:
         data = load_tasks()
+        if data is idle_view:
+            wait_for_change(60)
+            continue
+
         task = pick_actionable_task(data["tasks"])
 
         if task is None:
             write_status("idle", "Idle — no actionable tasks")
-            time.sleep(60)
+            idle_view = data
+            wait_for_change(60)
             continue
+        idle_view = None
 
         # Note: `task` is a snapshot from this iteration's load_tasks() — the web UI
         # could modify the task between here and the subprocess start, but the window
@@ -794,8 +917,10 @@ def main() -> None:
             plan_task(task)
 
 
-def _approve_decompose(task_id: int, decision: dict, plan_json: str) -> None:
+def _approve_decompose(task_id: int, decision: dict, plan_json: str,
+                       session: dict | None = None) -> None:
     """Create subtasks for a decompose decision and mark the parent decomposed.
+    `session`, if given, is appended to the parent's run history in the same pass.
 
     Two-pass approach:
       Pass 1 — Allocate absolute IDs for all subtasks, create task objects with
@@ -804,15 +929,17 @@ def _approve_decompose(task_id: int, decision: dict, plan_json: str) -> None:
                can efficiently unblock siblings without scanning all tasks.
     """
     def mutate(data):
-        task = next((t for t in data["tasks"] if t["id"] == task_id), None)
+        task = _find_task(data, task_id)
         if task is None:
             return
+        if session is not None:
+            _append_session(task, session)
 
         subtask_defs = decision.get("subtasks") or []
         n = len(subtask_defs)
         # Pre-allocate IDs so we can resolve relative indices -> absolute IDs
         abs_ids = [next_id(data) for _ in range(n)]
-        now = datetime.now(timezone.utc).isoformat()
+        now = _utc_now_iso()
 
         task["plan"] = plan_json
 
@@ -895,24 +1022,17 @@ def plan_task(task: dict) -> None:
     plan_duration_s = round((datetime.now(timezone.utc) - plan_session_start).total_seconds())
     plan_rate_limited = is_token_limit_error(plan_output)
 
-    def _append_plan_session(data):
-        for t in data["tasks"]:
-            if t["id"] == task_id:
-                if not isinstance(t.get("sessions"), list):
-                    t["sessions"] = []
-                t["sessions"].append({
-                    "started_at": plan_session_start.isoformat(),
-                    "duration_s": plan_duration_s,
-                    "exit_code": plan_rc,
-                    "rate_limited": plan_rate_limited,
-                })
-                break
-
-    locked_update(_append_plan_session)
+    # Recorded together with whichever status transition follows below.
+    plan_session = {
+        "started_at": _iso(plan_session_start),
+        "duration_s": plan_duration_s,
+        "exit_code": plan_rc,
+        "rate_limited": plan_rate_limited,
+    }
 
     if plan_rate_limited:
-        update_task(task_id, status="pending",
-                    rate_limited_at=datetime.now(timezone.utc).isoformat(),
+        update_task(task_id, status="pending", session=plan_session,
+                    rate_limited_at=_utc_now_iso(),
                     progress_action="token limit hit during planning",
                     progress_details="will retry after backoff")
         write_status("sleeping", "Token limit — backing off")
@@ -924,25 +1044,29 @@ def plan_task(task: dict) -> None:
 
     # Enforce max depth: cannot decompose at depth >= MAX_SUB_TASK_DEPTH
     if decision["decision"] == "decompose" and (task.get("depth") or 0) >= MAX_SUB_TASK_DEPTH:
-        update_task(task_id, status="stopped", stop_reason="max_depth_reached",
+        update_task(task_id, status="stopped", stop_reason="max_depth_reached", session=plan_session,
                     summary=f"Task reached max decomposition depth ({MAX_SUB_TASK_DEPTH}); cannot decompose further.",
                     progress_action="stopped", progress_details="max_depth_reached")
         print(f"[dispatcher] Task #{task_id} stopped: max_depth_reached.", flush=True)
         return
 
+    # The plan text is the free-form part of the decision; bound it before
+    # it is stored, whether it came from well-formed JSON or the raw fallback.
+    if isinstance(decision.get("plan"), str):
+        decision["plan"] = clip_text(decision["plan"])
     plan_json = json.dumps(decision, indent=2)
 
     if task.get("auto_approve"):
         if decision["decision"] == "decompose":
-            _approve_decompose(task_id, decision, plan_json)
+            _approve_decompose(task_id, decision, plan_json, session=plan_session)
             n = len(decision.get("subtasks") or [])
             print(f"[dispatcher] Task #{task_id} plan auto-approved: decomposed into {n} subtasks.", flush=True)
         else:
-            update_task(task_id, status="executing", plan=plan_json,
+            update_task(task_id, status="executing", plan=plan_json, session=plan_session,
                         progress_action="plan auto-approved")
             print(f"[dispatcher] Task #{task_id} plan auto-approved (execute).", flush=True)
     else:
-        update_task(task_id, status="plan_review", plan=plan_json,
+        update_task(task_id, status="plan_review", plan=plan_json, session=plan_session,
                     progress_action="plan ready for review")
         print(f"[dispatcher] Task #{task_id} plan ready for review ({decision['decision']}).", flush=True)
 
@@ -985,29 +1109,33 @@ def execute_task(task: dict) -> None:
     print(f"[dispatcher] Executing task #{task_id}: {task['prompt'][:80]}", flush=True)
 
     retry_count = 0
+    session_start = datetime.now(timezone.utc)
+    started_at = _iso(session_start)
 
-    def bump_retry(data):
+    # Bump the retry counter and either stop (doom loop) or mark the attempt
+    # started — one locked pass for both.
+    def start_attempt(data):
         nonlocal retry_count
-        for t in data["tasks"]:
-            if t["id"] == task_id:
-                t["retry_count"] = t.get("retry_count", 0) + 1
-                retry_count = t["retry_count"]
-                break
+        t = _find_task(data, task_id)
+        if t is None:
+            return False
+        t["retry_count"] = t.get("retry_count", 0) + 1
+        retry_count = t["retry_count"]
+        if retry_count > MAX_RETRIES:
+            t.update(status="stopped", stop_reason="loop_detected",
+                     summary=f"Task stopped after {retry_count - 1} retries (MAX_RETRIES={MAX_RETRIES}).")
+        else:
+            t.update(status="executing", started_at=started_at)
 
-    locked_update(bump_retry)
+    locked_update(start_attempt)
 
     if retry_count > MAX_RETRIES:
-        update_task(task_id, status="stopped", stop_reason="loop_detected",
-                    summary=f"Task stopped after {retry_count - 1} retries (MAX_RETRIES={MAX_RETRIES}).",
-                    progress_action="stopped", progress_details="loop_detected")
+        log_progress(task_id, "stopped", "loop_detected")
         print(f"[dispatcher] Task #{task_id} loop detected after {retry_count - 1} retries.", flush=True)
         return
 
-    session_start = datetime.now(timezone.utc)
     write_status("running", f"Executing #{task_id}", task_id)
-    update_task(task_id, status="executing",
-                started_at=session_start.isoformat(),
-                progress_action="started execution")
+    log_progress(task_id, "started execution")
     try:
         exec_model = task.get("exec_model") or task.get("model", DEFAULT_MODEL)
         plan_text = None
@@ -1029,20 +1157,13 @@ def execute_task(task: dict) -> None:
     duration_s = round((datetime.now(timezone.utc) - session_start).total_seconds())
     rate_limited = is_token_limit_error(exec_output)
 
-    def _append_exec_session(data):
-        for t in data["tasks"]:
-            if t["id"] == task_id:
-                if not isinstance(t.get("sessions"), list):
-                    t["sessions"] = []
-                t["sessions"].append({
-                    "started_at": session_start.isoformat(),
-                    "duration_s": duration_s,
-                    "exit_code": exec_rc,
-                    "rate_limited": rate_limited,
-                })
-                break
-
-    locked_update(_append_exec_session)
+    # Recorded together with whichever status transition follows below.
+    exec_session = {
+        "started_at": started_at,
+        "duration_s": duration_s,
+        "exit_code": exec_rc,
+        "rate_limited": rate_limited,
+    }
 
     if rate_limited:
         # Keep status as executing with plan intact (not pending) so the approved
@@ -1050,8 +1171,8 @@ def execute_task(task: dict) -> None:
         # directly back to execute_task, skipping the plan phase entirely.
         # Compare with plan_task's token limit handling, which resets to pending
         # because there's no approved plan to preserve.
-        update_task(task_id, status="executing",
-                    rate_limited_at=datetime.now(timezone.utc).isoformat(),
+        update_task(task_id, status="executing", session=exec_session,
+                    rate_limited_at=_utc_now_iso(),
                     progress_action="token limit hit during execution",
                     progress_details="will retry after backoff")
         write_status("sleeping", "Token limit — backing off")
@@ -1065,27 +1186,33 @@ def execute_task(task: dict) -> None:
         else:
             stop_reason = "execution_failed"
         error_snippet = exec_output.strip()[-300:] if exec_output.strip() else "no output"
-        update_task(task_id, status="stopped", stop_reason=stop_reason,
+        update_task(task_id, status="stopped", stop_reason=stop_reason, session=exec_session,
                     summary=f"Execution failed (exit {exec_rc}): {error_snippet}",
                     progress_action="stopped", progress_details=stop_reason)
         print(f"[dispatcher] Task #{task_id} stopped: {stop_reason} (exit {exec_rc}).", flush=True)
         return
 
-    now = datetime.now(timezone.utc).isoformat()
+    now = _utc_now_iso()
     result = parse_result_artifacts(exec_output)
     auto_detect_artifacts(result, session_start, WORKSPACE)
     summary = result["summary"]
     write_result_md(task_id, summary)
+    # result.md keeps the full text; tasks.json only needs enough to display
+    result["summary"] = summary = clip_text(summary)
     # Materialize document artifacts: write content to files, store path
     _materialize_document_artifacts(result, task_id)
     git_commit(f"agent: complete task #{task_id} — {task['prompt'][:60]}")
     push_workspace_repos()
-    update_task(task_id, status="done", completed_at=now, result=result,
+    update_task(task_id, status="done", completed_at=now, result=result, session=exec_session,
                 progress_action="completed",
                 progress_details=summary or "")
     parent_id = on_task_complete(task_id)
     if parent_id is not None:
         generate_parent_report(parent_id)
+    if ARCHIVE_ENABLED:
+        archived = archive_completed()
+        if archived:
+            print(f"[dispatcher] Archived {archived} finished task(s).", flush=True)
     print(f"[dispatcher] Task #{task_id} complete.", flush=True)
 
 
@@ -0,0 +1,96 @@
+"""
+Reusable SMTP connection for the digest and any future notifier.
+
+STARTTLS + AUTH is most of the cost of sending one mail, so a process keeps a
+single authenticated connection per (host, port, user) and reuses it across
+sends. Before each send the connection is health-checked with NOOP; a dead
+connection is dropped and re-established transparently. Connections are
+closed with QUIT at interpreter exit, not between sends.
+
+Standalone (stdlib only) so daily_digest.py can import it without the
+agent's sys.path setup.
+"""
+
+import atexit
+import smtplib
+import threading
+
+
+class SMTPPool:
+    """One lazily-opened, lock-guarded SMTP connection with NOOP health check."""
+
+    def __init__(self, host: str, port: int, user: str, password: str):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self._lock = threading.Lock()
+        self._server = None
+
+    def send_message(self, msg) -> None:
+        """Send msg over the shared connection, reconnecting if it went stale."""
+        with self._lock:
+            self._connection().send_message(msg)
+
+    def close(self) -> None:
+        """QUIT the connection if one is open. Safe to call repeatedly."""
+        with self._lock:
+            self._discard(graceful=True)
+
+    def _connection(self) -> smtplib.SMTP:
+        # Caller holds self._lock
+        if self._server is not None:
+            try:
+                if self._server.noop()[0] == 250:
+                    return self._server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._discard(graceful=False)
+
+        server = smtplib.SMTP(self.host, self.port)
+        try:
+            server.starttls()
+            server.login(self.user, self.password)
+        except BaseException:
+            server.close()
+            raise
+        self._server = server
+        return server
+
+    def _discard(self, graceful: bool) -> None:
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            if graceful:
+                server.quit()
+            else:
+                server.close()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+
+_POOLS: dict[tuple, SMTPPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(host: str, port: int, user: str, password: str) -> SMTPPool:
+    """Return the process-wide pool for these credentials, creating it on first use."""
+    key = (host, port, user)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None or pool.password != password:
+            if pool is not None:
+                pool.close()
+            pool = _POOLS[key] = SMTPPool(host, port, user, password)
+        return pool
+
+
+@atexit.register
+def close_all() -> None:
+    """QUIT every pooled connection — registered to run at interpreter exit."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
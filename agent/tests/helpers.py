@@ -1,10 +1,32 @@
 """Shared test utilities."""
 
+import io
 import json
 from pathlib import Path
+from unittest.mock import MagicMock
 
 
 def write_tasks(tf: Path, data: dict) -> None:
     """Write a tasks dict to a tmp file and ensure the lock file exists."""
     tf.write_text(json.dumps(data))
     tf.with_suffix(".lock").touch(exist_ok=True)
+
+
+def fake_popen(stdout: str = "", returncode: int = 0):
+    """Build a stand-in for subprocess.Popen as used by the CC runners.
+
+    Returns a MagicMock to patch over subprocess.Popen; each call yields a
+    process whose merged stdout streams `stdout` line by line and whose
+    wait() returns `returncode`. `stdout` may also be a callable taking the
+    command list, for tests that spawn more than one kind of CC run.
+    Inspect the command via call_args like a subprocess.run mock.
+    """
+    def _spawn(cmd, *args, **kwargs):
+        proc = MagicMock()
+        proc.__enter__.return_value = proc
+        proc.stdout = io.StringIO(stdout(cmd) if callable(stdout) else stdout)
+        proc.wait.return_value = returncode
+        proc.returncode = returncode
+        return proc
+
+    return MagicMock(side_effect=_spawn)
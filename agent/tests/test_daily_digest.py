@@ -5,7 +5,8 @@ import os
 import pytest
 from unittest.mock import MagicMock, patch
 import daily_digest
-from daily_digest import load_env_file, build_body
+import smtp_pool
+from daily_digest import load_env_file, build_body, classify_tasks
 
 
 class TestLoadEnvFile:
@@ -57,6 +58,17 @@ class TestLoadEnvFile:
     def test_handles_missing_file(self):
         load_env_file("/nonexistent/path/.env")  # should not raise
 
+    def test_trims_whitespace_crlf_and_keeps_equals_in_value(self, tmp_path, monkeypatch):
+        env_file = tmp_path / ".env"
+        env_file.write_bytes(b"  TOKEN = a=b=c  \r\n  # COMMENTED=1\r\nNOEQUALS\r\n")
+        monkeypatch.delenv("TOKEN", raising=False)
+        monkeypatch.delenv("COMMENTED", raising=False)
+
+        load_env_file(str(env_file))
+
+        assert os.environ["TOKEN"] == "a=b=c"
+        assert "COMMENTED" not in os.environ
+
 
 class TestBuildBody:
     """build_body produces three sections: Completed (today only), Pending (all),
@@ -69,7 +81,7 @@ class TestBuildBody:
             {"id": 2, "status": "pending", "prompt": "Task B"},
             {"id": 3, "status": "stopped", "prompt": "Task C", "created_at": f"{today}T08:00:00"},
         ]
-        body = build_body(tasks, today)
+        body, _ = build_body(tasks, today)
 
         assert "Completed (1):" in body
         assert "#1" in body
@@ -85,7 +97,7 @@ class TestBuildBody:
             {"id": 1, "status": "done", "prompt": "Today", "completed_at": f"{today}T10:00:00"},
             {"id": 2, "status": "done", "prompt": "Yesterday", "completed_at": "2026-03-22T23:59:00"},
         ]
-        body = build_body(tasks, today)
+        body, _ = build_body(tasks, today)
 
         assert "#1" in body
         assert "#2" not in body
@@ -98,13 +110,13 @@ class TestBuildBody:
             {"id": 1, "status": "stopped", "prompt": "Broken task",
              "stop_reason": "loop_detected", "created_at": f"{today}T08:00:00"},
         ]
-        body = build_body(tasks, today)
+        body, _ = build_body(tasks, today)
 
         assert "loop_detected" in body
         assert "#1" in body
 
     def test_empty_lists(self):
-        body = build_body([], "2026-02-27")
+        body, _ = build_body([], "2026-02-27")
         assert "(none)" in body
         assert "Completed (0):" in body
         assert "Pending (0):" in body
@@ -120,7 +132,7 @@ class TestBuildBody:
                  {"started_at": f"{today}T09:30:00", "duration_s": 60,  "exit_code": 0, "rate_limited": True},
              ]},
         ]
-        body = build_body(tasks, today)
+        body, _ = build_body(tasks, today)
 
         assert "Sessions today: 2" in body
         assert "Rate limits: 1" in body
@@ -135,7 +147,7 @@ class TestBuildBody:
                  {"started_at": "2026-03-28T22:00:00", "duration_s": 300, "exit_code": 0, "rate_limited": True},
              ]},
         ]
-        body = build_body(tasks, today)
+        body, _ = build_body(tasks, today)
 
         assert "Sessions today: 0" in body
         assert "Rate limits: 0" in body
@@ -145,17 +157,75 @@ class TestBuildBody:
         """Tasks with no sessions show zero stats without error."""
         today = "2026-03-29"
         tasks = [{"id": 1, "status": "pending", "prompt": "Task A"}]
-        body = build_body(tasks, today)
+        body, _ = build_body(tasks, today)
 
         assert "Sessions today: 0" in body
         assert "Rate limits: 0" in body
         assert "Avg duration: n/a" in body
 
 
+class TestClassifyTasks:
+    """classify_tasks buckets tasks for the digest in one pass."""
+
+    def test_buckets(self):
+        tasks = [
+            {"id": 1, "status": "done", "completed_at": "2026-01-02T10:00:00"},
+            {"id": 2, "status": "done", "completed_at": "2026-01-01T10:00:00"},
+            {"id": 3, "status": "pending"},
+            {"id": 4, "status": "stopped", "created_at": "2025-12-01T00:00:00"},
+            {"id": 5, "status": "executing"},
+        ]
+        done, pending, failed = classify_tasks(tasks, "2026-01-02")
+        assert [t["id"] for t in done] == [1]
+        assert [t["id"] for t in pending] == [3]
+        assert [t["id"] for t in failed] == [4]
+
+    def test_build_body_counts_match_buckets(self):
+        tasks = [
+            {"id": 1, "status": "done", "prompt": "a", "completed_at": "2026-01-02T10:00:00"},
+            {"id": 2, "status": "pending", "prompt": "b"},
+            {"id": 3, "status": "pending", "prompt": "c"},
+        ]
+        _, counts = build_body(tasks, "2026-01-02")
+        assert counts == {"done": 1, "pending": 2, "failed": 0}
+
+
+class TestLoadTasks:
+    """load_tasks reuses task_store's cached view only when it is loaded in-process
+    and points at the same tasks.json; otherwise it parses the file itself."""
+
+    def test_reuses_task_store_for_same_file(self, tmp_path, monkeypatch):
+        import task_store
+        tf = tmp_path / "tasks.json"
+        tf.write_text(json.dumps({"tasks": [{"id": 1}]}))
+        monkeypatch.setattr(daily_digest, "TASKS_FILE", tf)
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+
+        assert daily_digest.load_tasks() is task_store.load_tasks()
+
+    def test_parses_itself_for_other_file(self, tmp_path, monkeypatch):
+        import task_store
+        tf = tmp_path / "tasks.json"
+        tf.write_text(json.dumps({"tasks": [{"id": 7}]}))
+        monkeypatch.setattr(daily_digest, "TASKS_FILE", tf)
+        monkeypatch.setattr(task_store, "TASKS_FILE", tmp_path / "other.json")
+
+        assert daily_digest.load_tasks() == {"tasks": [{"id": 7}]}
+
+    def test_missing_file_is_empty(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(daily_digest, "TASKS_FILE", tmp_path / "missing.json")
+        assert daily_digest.load_tasks() == {"tasks": []}
+
+
 class TestSendDigest:
     """send_digest loads credentials, builds the email body, and delivers via SMTP.
     Silently skips if SMTP_USER or SMTP_PASSWORD are missing."""
 
+    @pytest.fixture(autouse=True)
+    def fresh_pools(self, monkeypatch):
+        """Each test gets an empty connection pool — no mock leaks between tests."""
+        monkeypatch.setattr(smtp_pool, "_POOLS", {})
+
     def test_skips_without_credentials(self, tmp_path, monkeypatch):
         tf = tmp_path / "tasks.json"
         tf.write_text(json.dumps({"tasks": []}))
@@ -187,3 +257,5 @@ class TestSendDigest:
             mock_server.starttls.assert_called_once()
             mock_server.login.assert_called_once_with("test@example.com", "secret")
             mock_server.send_message.assert_called_once()
+            msg = mock_server.send_message.call_args[0][0]
+            assert msg["Subject"].startswith("Agent Daily Report — 0 done, 0 pending")
@@ -386,6 +386,27 @@ class TestGenerateParentReport:
         assert tasks[1].get("report") is not None
         assert "A done" in tasks[1]["report"] or "B done" in tasks[1]["report"]
 
+    def test_generate_parent_report_clips_stored_report(self, tmp_path, monkeypatch):
+        tf = tmp_path / "tasks.json"
+        data = {"tasks": [
+            {"id": 1, "status": "decomposed", "prompt": "parent task",
+             "children": [2], "parent": None, "unresolved_children": 0},
+            {"id": 2, "status": "done", "parent": 1, "prompt": "subtask A",
+             "children": [], "result": {"summary": "A done"}},
+        ]}
+        write_tasks(tf, data)
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        monkeypatch.setattr(task_store, "MAX_TEXT_CHARS", 100)
+        monkeypatch.setattr(dispatcher, "WORKSPACE", str(tmp_path))
+        monkeypatch.setattr(dispatcher, "run_cc_local", lambda prompt, model=None: (0, "r" * 500))
+
+        dispatcher.generate_parent_report(1)
+
+        report = json.loads(tf.read_text())["tasks"][0]["report"]
+        assert len(report) == 100
+        report_md = tmp_path / "agent_log" / "tasks" / "task_1" / "report.md"
+        assert "r" * 500 in report_md.read_text()
+
     def test_generate_parent_report_skips_when_no_children_with_summaries(
         self, tmp_path, monkeypatch
     ):
@@ -6,7 +6,7 @@ import pytest
 from unittest.mock import MagicMock
 import dispatcher
 import task_store
-from helpers import write_tasks
+from helpers import fake_popen, write_tasks
 
 
 class TestDoomLoop:
@@ -15,11 +15,15 @@ class TestDoomLoop:
     First real execution has retry_count=1, so MAX_RETRIES=3 allows 3 attempts
     (retry_count 1, 2, 3 pass; retry_count 4 triggers stop)."""
 
-    def _exec_mock(self):
-        """Mock subprocess.run that returns a successful CC result."""
-        return MagicMock(return_value=MagicMock(
-            returncode=0, stdout='{"type":"result","result":"done"}', stderr=""
-        ))
+    def _exec_mock(self, monkeypatch):
+        """Patch CC runs (subprocess.Popen) to return a successful result and the
+        post-task git helpers (subprocess.run) to no-op. Returns the Popen mock."""
+        monkeypatch.setattr("subprocess.run", MagicMock(return_value=MagicMock(
+            returncode=0, stdout="", stderr=""
+        )))
+        mock_popen = fake_popen('{"type":"result","result":"done"}')
+        monkeypatch.setattr("subprocess.Popen", mock_popen)
+        return mock_popen
 
     def _make_task(self, retry_count=0):
         """Build a minimal in_progress task dict with the given retry_count."""
@@ -35,7 +39,7 @@ class TestDoomLoop:
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
         monkeypatch.setattr(dispatcher, "MAX_RETRIES", 10)
-        monkeypatch.setattr("subprocess.run", self._exec_mock())
+        self._exec_mock(monkeypatch)
 
         dispatcher.execute_task(task)
 
@@ -50,15 +54,14 @@ class TestDoomLoop:
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
         monkeypatch.setattr(dispatcher, "MAX_RETRIES", 3)
-        mock_run = self._exec_mock()
-        monkeypatch.setattr("subprocess.run", mock_run)
+        mock_popen = self._exec_mock(monkeypatch)
 
         dispatcher.execute_task(task)
 
         t = json.loads(tf.read_text())["tasks"][0]
         assert t["status"] == "stopped"
         assert t["stop_reason"] == "loop_detected"
-        mock_run.assert_not_called()
+        mock_popen.assert_not_called()
 
     def test_runs_normally_at_threshold(self, tmp_path, monkeypatch):
         """retry_count=2 + increment → 3, which is NOT > MAX_RETRIES(3) → allowed."""
@@ -68,7 +71,7 @@ class TestDoomLoop:
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
         monkeypatch.setattr(dispatcher, "MAX_RETRIES", 3)
-        monkeypatch.setattr("subprocess.run", self._exec_mock())
+        self._exec_mock(monkeypatch)
 
         dispatcher.execute_task(task)
 
@@ -88,7 +91,7 @@ class TestDoomLoop:
         write_tasks(tf, {"tasks": [task]})
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
-        monkeypatch.setattr("subprocess.run", self._exec_mock())
+        self._exec_mock(monkeypatch)
 
         dispatcher.execute_task(task)
 
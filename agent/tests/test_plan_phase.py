@@ -7,7 +7,7 @@ from unittest.mock import MagicMock
 import dispatcher
 import task_store
 from dispatcher import parse_plan_decision, build_plan_prompt, build_task_prompt
-from helpers import write_tasks
+from helpers import fake_popen, write_tasks
 
 
 class TestParsePlanDecision:
@@ -181,15 +181,14 @@ class TestExecuteTaskPlanInjection:
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
 
-        mock_run = MagicMock(return_value=MagicMock(
-            returncode=0, stdout='{"type":"result","result":"done"}', stderr=""
-        ))
-        monkeypatch.setattr("subprocess.run", mock_run)
+        mock_popen = fake_popen('{"type":"result","result":"done"}')
+        monkeypatch.setattr("subprocess.Popen", mock_popen)
+        monkeypatch.setattr("subprocess.run", MagicMock(return_value=MagicMock(returncode=0, stdout="", stderr="")))
 
         dispatcher.execute_task(task)
 
         # Extract the prompt from the Docker command: find -p flag, next arg is the text.
-        docker_call = mock_run.call_args_list[0][0][0]
+        docker_call = mock_popen.call_args_list[0][0][0]
         p_idx = docker_call.index("-p")
         prompt_sent = docker_call[p_idx + 1]
         assert "APPROVED PLAN:" in prompt_sent
@@ -205,14 +204,13 @@ class TestExecuteTaskPlanInjection:
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
 
-        mock_run = MagicMock(return_value=MagicMock(
-            returncode=0, stdout='{"type":"result","result":"done"}', stderr=""
-        ))
-        monkeypatch.setattr("subprocess.run", mock_run)
+        mock_popen = fake_popen('{"type":"result","result":"done"}')
+        monkeypatch.setattr("subprocess.Popen", mock_popen)
+        monkeypatch.setattr("subprocess.run", MagicMock(return_value=MagicMock(returncode=0, stdout="", stderr="")))
 
         dispatcher.execute_task(task)
 
-        docker_call = mock_run.call_args_list[0][0][0]
+        docker_call = mock_popen.call_args_list[0][0][0]
         p_idx = docker_call.index("-p")
         prompt_sent = docker_call[p_idx + 1]
         assert "APPROVED PLAN" not in prompt_sent
@@ -226,14 +224,13 @@ class TestExecuteTaskPlanInjection:
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
 
-        mock_run = MagicMock(return_value=MagicMock(
-            returncode=0, stdout='{"type":"result","result":"done"}', stderr=""
-        ))
-        monkeypatch.setattr("subprocess.run", mock_run)
+        mock_popen = fake_popen('{"type":"result","result":"done"}')
+        monkeypatch.setattr("subprocess.Popen", mock_popen)
+        monkeypatch.setattr("subprocess.run", MagicMock(return_value=MagicMock(returncode=0, stdout="", stderr="")))
 
         dispatcher.execute_task(task)  # should not raise
 
-        docker_call = mock_run.call_args_list[0][0][0]
+        docker_call = mock_popen.call_args_list[0][0][0]
         p_idx = docker_call.index("-p")
         prompt_sent = docker_call[p_idx + 1]
         assert "APPROVED PLAN" not in prompt_sent
@@ -246,11 +243,7 @@ class TestMaxDepth:
         decompose_json = json.dumps({"decision": "decompose", "subtasks": [
             {"prompt": "s", "depends_on": []}
         ]})
-        return MagicMock(return_value=MagicMock(
-            returncode=0,
-            stdout=json.dumps({"type": "result", "result": decompose_json}),
-            stderr="",
-        ))
+        return fake_popen(json.dumps({"type": "result", "result": decompose_json}))
 
     def test_stops_decompose_at_max_depth(self, tmp_path, monkeypatch):
         monkeypatch.setattr(dispatcher, "MAX_SUB_TASK_DEPTH", 3)
@@ -261,7 +254,7 @@ class TestMaxDepth:
         write_tasks(tf, {"tasks": [task], "next_id": 2})
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
-        monkeypatch.setattr("subprocess.run", self._decompose_mock())
+        monkeypatch.setattr("subprocess.Popen", self._decompose_mock())
 
         dispatcher.plan_task(task)
 
@@ -278,7 +271,7 @@ class TestMaxDepth:
         write_tasks(tf, {"tasks": [task], "next_id": 2})
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
-        monkeypatch.setattr("subprocess.run", self._decompose_mock())
+        monkeypatch.setattr("subprocess.Popen", self._decompose_mock())
 
         dispatcher.plan_task(task)
 
@@ -313,19 +306,11 @@ class TestAutoApproveDecompose:
             {"prompt": "do A", "depends_on": []},
             {"prompt": "do B", "depends_on": [0]},
         ]})
-        return MagicMock(return_value=MagicMock(
-            returncode=0,
-            stdout=json.dumps({"type": "result", "result": decompose_json}),
-            stderr="",
-        ))
+        return fake_popen(json.dumps({"type": "result", "result": decompose_json}))
 
     def _execute_mock(self):
         execute_json = json.dumps({"decision": "execute", "plan": "1. do it"})
-        return MagicMock(return_value=MagicMock(
-            returncode=0,
-            stdout=json.dumps({"type": "result", "result": execute_json}),
-            stderr="",
-        ))
+        return fake_popen(json.dumps({"type": "result", "result": execute_json}))
 
     def test_auto_approve_execute_sets_executing(self, tmp_path, monkeypatch):
         tf = tmp_path / "tasks.json"
@@ -335,13 +320,36 @@ class TestAutoApproveDecompose:
         write_tasks(tf, {"tasks": [task], "next_id": 2})
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
-        monkeypatch.setattr("subprocess.run", self._execute_mock())
+        monkeypatch.setattr("subprocess.Popen", self._execute_mock())
 
         dispatcher.plan_task(task)
 
         t = json.loads(tf.read_text())["tasks"][0]
         assert t["status"] == "executing"
 
+    def test_plan_session_recorded_with_transition(self, tmp_path, monkeypatch):
+        """The plan run's session record is written in the same locked pass as
+        the resulting status change — exactly one entry, no separate write."""
+        tf = tmp_path / "tasks.json"
+        task = {"id": 1, "status": "pending", "prompt": "test",
+                "plan_model": "sonnet", "exec_model": "sonnet",
+                "priority": "medium", "depth": 0, "auto_approve": True}
+        write_tasks(tf, {"tasks": [task], "next_id": 2})
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
+        monkeypatch.setattr("subprocess.Popen", self._execute_mock())
+        writes = []
+        real_locked_update = dispatcher.locked_update
+        monkeypatch.setattr(dispatcher, "locked_update",
+                            lambda fn: writes.append(fn) or real_locked_update(fn))
+
+        dispatcher.plan_task(task)
+
+        t = json.loads(tf.read_text())["tasks"][0]
+        assert len(t["sessions"]) == 1
+        assert t["sessions"][0]["exit_code"] == 0
+        assert len(writes) == 2  # "planning" + (session, "executing")
+
     def test_auto_approve_decompose_sets_decomposed(self, tmp_path, monkeypatch):
         tf = tmp_path / "tasks.json"
         task = {"id": 1, "status": "pending", "prompt": "test",
@@ -350,7 +358,7 @@ class TestAutoApproveDecompose:
         write_tasks(tf, {"tasks": [task], "next_id": 2})
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
-        monkeypatch.setattr("subprocess.run", self._decompose_mock())
+        monkeypatch.setattr("subprocess.Popen", self._decompose_mock())
 
         dispatcher.plan_task(task)
 
@@ -368,7 +376,7 @@ class TestAutoApproveDecompose:
         write_tasks(tf, {"tasks": [task], "next_id": 2})
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
-        monkeypatch.setattr("subprocess.run", self._decompose_mock())
+        monkeypatch.setattr("subprocess.Popen", self._decompose_mock())
 
         dispatcher.plan_task(task)
 
@@ -395,7 +403,7 @@ class TestAutoApproveDecompose:
         write_tasks(tf, {"tasks": [task], "next_id": 2})
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
-        monkeypatch.setattr("subprocess.run", self._decompose_mock())
+        monkeypatch.setattr("subprocess.Popen", self._decompose_mock())
 
         dispatcher.plan_task(task)
 
@@ -416,7 +424,7 @@ class TestAutoApproveDecompose:
         write_tasks(tf, {"tasks": [task], "next_id": 2})
         monkeypatch.setattr(task_store, "TASKS_FILE", tf)
         monkeypatch.setattr(dispatcher, "STATUS_FILE", tmp_path / "status.json")
-        monkeypatch.setattr("subprocess.run", self._decompose_mock())
+        monkeypatch.setattr("subprocess.Popen", self._decompose_mock())
 
         dispatcher.plan_task(task)
 
@@ -0,0 +1,77 @@
+"""Tests for agent/smtp_pool.py — reusable SMTP connection with NOOP health check."""
+
+import smtplib
+import pytest
+from unittest.mock import MagicMock, patch
+import smtp_pool
+from smtp_pool import SMTPPool, get_pool
+
+
+def _server(noop_code=250):
+    server = MagicMock()
+    server.noop.return_value = (noop_code, b"OK")
+    return server
+
+
+class TestSMTPPool:
+    """Connection is opened once (STARTTLS + LOGIN) and reused while NOOP succeeds."""
+
+    def test_reuses_connection_across_sends(self):
+        server = _server()
+        with patch("smtplib.SMTP", return_value=server) as mock_smtp:
+            pool = SMTPPool("smtp.test.com", 587, "u", "p")
+            pool.send_message("m1")
+            pool.send_message("m2")
+
+        mock_smtp.assert_called_once_with("smtp.test.com", 587)
+        server.starttls.assert_called_once()
+        server.login.assert_called_once_with("u", "p")
+        assert server.send_message.call_count == 2
+
+    def test_reconnects_when_noop_fails(self):
+        stale, fresh = _server(), _server()
+        stale.noop.side_effect = smtplib.SMTPServerDisconnected()
+        with patch("smtplib.SMTP", side_effect=[stale, fresh]) as mock_smtp:
+            pool = SMTPPool("h", 25, "u", "p")
+            pool.send_message("m1")
+            pool.send_message("m2")
+
+        assert mock_smtp.call_count == 2
+        stale.close.assert_called_once()
+        fresh.send_message.assert_called_once_with("m2")
+
+    def test_login_failure_closes_socket_and_raises(self):
+        server = _server()
+        server.login.side_effect = smtplib.SMTPAuthenticationError(535, b"bad")
+        with patch("smtplib.SMTP", return_value=server):
+            pool = SMTPPool("h", 25, "u", "p")
+            with pytest.raises(smtplib.SMTPAuthenticationError):
+                pool.send_message("m")
+
+        server.close.assert_called_once()
+        assert pool._server is None
+
+    def test_close_quits(self):
+        server = _server()
+        with patch("smtplib.SMTP", return_value=server):
+            pool = SMTPPool("h", 25, "u", "p")
+            pool.send_message("m")
+            pool.close()
+            pool.close()
+
+        server.quit.assert_called_once()
+
+
+class TestGetPool:
+    """get_pool hands out one pool per (host, port, user)."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_pools(self, monkeypatch):
+        monkeypatch.setattr(smtp_pool, "_POOLS", {})
+
+    def test_same_credentials_share_pool(self):
+        assert get_pool("h", 25, "u", "p") is get_pool("h", 25, "u", "p")
+
+    def test_changed_password_replaces_pool(self):
+        first = get_pool("h", 25, "u", "old")
+        assert get_pool("h", 25, "u", "new") is not first
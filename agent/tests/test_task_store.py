@@ -5,6 +5,7 @@ Concurrency/locking is hard to unit-test; these tests verify correctness
 and safety guarantees (atomic writes, exception safety, monotonic IDs).
 """
 
+import gzip
 import json
 import pytest
 import task_store
@@ -36,6 +37,72 @@ class TestLoadTasks:
             task_store.load_tasks()
 
 
+class TestLoadTasksCache:
+    """load_tasks caches the parse keyed on the file's stat, so repeated polls
+    of an unchanged tasks.json skip the read + json.loads entirely."""
+
+    def test_unchanged_file_returns_cached_object(self, tmp_path, monkeypatch):
+        tf = tmp_path / "tasks.json"
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending"}]})
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+
+        first = task_store.load_tasks()
+        assert task_store.load_tasks() is first
+
+    def test_external_rewrite_invalidates(self, tmp_path, monkeypatch):
+        """A write by another process (new size/mtime) must be picked up."""
+        tf = tmp_path / "tasks.json"
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending"}]})
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        task_store.load_tasks()
+
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "done"}, {"id": 2, "status": "pending"}]})
+        assert len(task_store.load_tasks()["tasks"]) == 2
+
+    def test_locked_update_sees_fresh_data(self, tmp_path, monkeypatch):
+        """locked_update never mutates the shared cached dict."""
+        tf = tmp_path / "tasks.json"
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending"}]})
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        cached = task_store.load_tasks()
+
+        task_store.locked_update(lambda d: d["tasks"][0].update(status="done"))
+
+        assert cached["tasks"][0]["status"] == "pending"
+        assert task_store.load_tasks()["tasks"][0]["status"] == "done"
+
+    def test_indexed_reuses_index_until_file_changes(self, tmp_path, monkeypatch):
+        tf = tmp_path / "tasks.json"
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending"}, {"id": 5, "status": "done"}]})
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+
+        data, index = task_store.load_tasks_indexed()
+        assert index[5] is data["tasks"][1]
+        assert task_store.load_tasks_indexed()[1] is index
+
+        task_store.locked_update(lambda d: d["tasks"].append({"id": 9, "status": "pending"}))
+        assert 9 in task_store.load_tasks_indexed()[1]
+
+    def test_indexed_missing_file(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(task_store, "TASKS_FILE", tmp_path / "tasks.json")
+        assert task_store.load_tasks_indexed() == ({"tasks": []}, {})
+
+    def test_children_index_groups_by_parent(self, tmp_path, monkeypatch):
+        tf = tmp_path / "tasks.json"
+        write_tasks(tf, {"tasks": [
+            {"id": 1, "parent": None}, {"id": 2, "parent": 1}, {"id": 3, "parent": 1},
+        ]})
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+
+        children = task_store.load_children_index()
+        assert [t["id"] for t in children[1]] == [2, 3]
+        assert 2 not in children
+        assert task_store.load_children_index() is children
+
+        task_store.locked_update(lambda d: d["tasks"].append({"id": 4, "parent": 2}))
+        assert [t["id"] for t in task_store.load_children_index()[2]] == [4]
+
+
 class TestSaveTasks:
     """save_tasks writes atomically via tmp.replace (POSIX rename)."""
 
@@ -55,6 +122,16 @@ class TestSaveTasks:
         task_store.save_tasks({"tasks": []})
         assert json.loads(tf.read_text()) == {"tasks": []}
 
+    def test_roundtrip_without_orjson(self, tmp_path, monkeypatch):
+        """The stdlib fallback writes the same JSON and reads it back."""
+        tf = tmp_path / "tasks.json"
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        monkeypatch.setattr(task_store, "orjson", None)
+        data = {"tasks": [{"id": 1, "status": "done", "prompt": "héllo"}]}
+        task_store.save_tasks(data)
+        assert json.loads(tf.read_text()) == data
+        assert task_store.load_tasks() == data
+
 
 class TestLockedUpdate:
     """locked_update holds an exclusive flock during read→mutate→write.
@@ -133,6 +210,23 @@ class TestNextId:
         assert data["next_id"] == 6
 
 
+class TestClipText:
+    """clip_text bounds free-text fields kept inline in tasks.json."""
+
+    def test_short_text_unchanged(self):
+        assert task_store.clip_text("hello", limit=10) == "hello"
+
+    def test_long_text_clipped_with_marker(self):
+        out = task_store.clip_text("x" * 500, limit=100)
+        assert len(out) == 100
+        assert out.startswith("x")
+        assert out.endswith("[truncated 400 chars]")
+
+    def test_default_limit(self, monkeypatch):
+        monkeypatch.setattr(task_store, "MAX_TEXT_CHARS", 50)
+        assert len(task_store.clip_text("y" * 200)) == 50
+
+
 class TestAtomicWrite:
     """Verify atomic write guarantees: no .tmp residue, file creation from scratch."""
 
@@ -145,6 +239,79 @@ class TestAtomicWrite:
         assert tf.exists()
         assert not tf.with_suffix(".tmp").exists()
 
+    def test_save_tasks_writes_through_cache(self, tmp_path, monkeypatch):
+        """Our own save primes the cache, so the next load skips the re-parse."""
+        tf = tmp_path / "tasks.json"
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        data = {"tasks": [{"id": 1}]}
+        task_store.save_tasks(data)
+        assert task_store.load_tasks() is data
+
+    def test_save_tasks_fsync_opt_in(self, tmp_path, monkeypatch):
+        """TASKS_FSYNC=1 flushes the tmp file (fdatasync) before the rename; off by default."""
+        tf = tmp_path / "tasks.json"
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        synced = []
+        monkeypatch.setattr(task_store, "_datasync", lambda fd: synced.append(fd))
+
+        task_store.save_tasks({"tasks": []})
+        assert synced == []
+
+        monkeypatch.setattr(task_store, "TASKS_FSYNC", True)
+        task_store.save_tasks({"tasks": []})
+        assert len(synced) == 1
+
+    def test_save_tasks_compact_unless_pretty(self, tmp_path, monkeypatch):
+        """tasks.json is compact by default; TASKS_PRETTY=1 indents it."""
+        tf = tmp_path / "tasks.json"
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        data = {"tasks": [{"id": 1, "status": "pending"}]}
+
+        task_store.save_tasks(data)
+        assert "\n" not in tf.read_text()
+
+        monkeypatch.setattr(task_store, "TASKS_PRETTY", True)
+        task_store.save_tasks(data)
+        assert '\n  "tasks"' in tf.read_text()
+        assert json.loads(tf.read_text()) == data
+
+    def test_locked_update_serializes_concurrent_writers(self, tmp_path, monkeypatch):
+        """Concurrent read-modify-write cycles (e.g. two web requests) must not
+        lose updates: the flock serializes them."""
+        import threading
+        tf = tmp_path / "tasks.json"
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        task_store.save_tasks({"tasks": [], "counter": 0})
+
+        def bump(data):
+            data["counter"] += 1
+
+        def worker():
+            for _ in range(10):
+                task_store.locked_update(bump)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert json.loads(tf.read_text())["counter"] == 80
+
+    def test_locked_update_skips_save_when_mutate_returns_false(self, tmp_path, monkeypatch):
+        tf = tmp_path / "tasks.json"
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        task_store.save_tasks({"tasks": [{"id": 1}]})
+        before = tf.stat()
+
+        def no_op(data):
+            data["tasks"].append({"id": 2})  # discarded: not saved
+            return False
+
+        task_store.locked_update(no_op)
+        after = tf.stat()
+        assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+        assert json.loads(tf.read_text())["tasks"] == [{"id": 1}]
+
     def test_locked_update_creates_file_from_scratch(self, tmp_path, monkeypatch):
         """locked_update on a missing tasks.json should create it — load_tasks
         returns the empty structure, mutate_fn populates it, save_tasks writes it."""
@@ -159,3 +326,116 @@ class TestAtomicWrite:
         assert tf.exists()
         assert len(result["tasks"]) == 1
         assert json.loads(tf.read_text())["tasks"][0]["id"] == 1
+
+
+class TestWaitForChange:
+    """wait_for_change returns as soon as tasks.json differs from what
+    load_tasks last saw, and False once the timeout elapses."""
+
+    def test_returns_true_when_file_changed_since_load(self, tmp_path, monkeypatch):
+        tf = tmp_path / "tasks.json"
+        write_tasks(tf, {"tasks": []})
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        task_store.load_tasks()
+
+        # Another process (e.g. the web UI) writes after our last load.
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending"}]})
+
+        assert task_store.wait_for_change(5, poll_interval=0.01) is True
+
+    def test_times_out_when_unchanged(self, tmp_path, monkeypatch):
+        tf = tmp_path / "tasks.json"
+        write_tasks(tf, {"tasks": []})
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        task_store.load_tasks()
+
+        assert task_store.wait_for_change(0.05, poll_interval=0.01) is False
+
+    def test_times_out_after_file_removed(self, tmp_path, monkeypatch):
+        tf = tmp_path / "tasks.json"
+        write_tasks(tf, {"tasks": []})
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        task_store.load_tasks()
+        tf.unlink()
+        assert task_store.load_tasks() == {"tasks": []}
+
+        assert task_store.wait_for_change(0.05, poll_interval=0.01) is False
+
+
+class TestArchiveCompleted:
+    """archive_completed moves whole, long-finished done trees to the compressed
+    append-only archive and keeps the id counter monotonic."""
+
+    OLD = "2020-01-01T00:00:00+00:00"
+
+    @staticmethod
+    def _archived():
+        path = task_store.archive_path()
+        if not path.exists():
+            return []
+        with gzip.open(path, "rt") as f:
+            return [json.loads(line) for line in f]
+
+    def _setup(self, tmp_path, monkeypatch, tasks, **extra):
+        tf = tmp_path / "tasks.json"
+        write_tasks(tf, {"tasks": tasks, **extra})
+        monkeypatch.setattr(task_store, "TASKS_FILE", tf)
+        return tf
+
+    def test_moves_old_done_tasks(self, tmp_path, monkeypatch):
+        tf = self._setup(tmp_path, monkeypatch, [
+            {"id": 1, "status": "done", "completed_at": self.OLD},
+            {"id": 2, "status": "pending"},
+            {"id": 3, "status": "done", "completed_at": "2999-01-01T00:00:00+00:00"},
+        ])
+
+        assert task_store.archive_completed(7) == 1
+
+        data = json.loads(tf.read_text())
+        assert [t["id"] for t in data["tasks"]] == [2, 3]
+        assert [t["id"] for t in self._archived()] == [1]
+
+    def test_keeps_tree_with_unfinished_member(self, tmp_path, monkeypatch):
+        self._setup(tmp_path, monkeypatch, [
+            {"id": 1, "status": "done", "completed_at": self.OLD, "children": [2, 3]},
+            {"id": 2, "status": "done", "completed_at": self.OLD, "parent": 1},
+            {"id": 3, "status": "stopped", "parent": 1},
+            {"id": 4, "status": "decomposed", "children": [5]},
+            {"id": 5, "status": "done", "completed_at": self.OLD, "parent": 4},
+        ])
+
+        assert task_store.archive_completed(7) == 0
+        assert self._archived() == []
+
+    def test_moves_finished_decomposed_tree(self, tmp_path, monkeypatch):
+        tf = self._setup(tmp_path, monkeypatch, [
+            {"id": 1, "status": "decomposed", "children": [2, 3], "report": "all done"},
+            {"id": 2, "status": "done", "completed_at": self.OLD, "parent": 1},
+            {"id": 3, "status": "decomposed", "parent": 1, "children": [4], "report": "r"},
+            {"id": 4, "status": "done", "completed_at": self.OLD, "parent": 3},
+            {"id": 5, "status": "decomposed", "children": [6]},
+            {"id": 6, "status": "done", "completed_at": self.OLD, "parent": 5},
+        ])
+
+        assert task_store.archive_completed(7) == 4
+        assert [t["id"] for t in json.loads(tf.read_text())["tasks"]] == [5, 6]
+
+    def test_nothing_to_archive_skips_the_write(self, tmp_path, monkeypatch):
+        tf = self._setup(tmp_path, monkeypatch, [{"id": 1, "status": "pending"}])
+        before = tf.stat().st_ino
+
+        assert task_store.archive_completed(7) == 0
+        assert tf.stat().st_ino == before  # every save renames in a new inode
+
+    def test_appends_and_pins_id_counter(self, tmp_path, monkeypatch):
+        tf = self._setup(tmp_path, monkeypatch, [
+            {"id": 1, "status": "done", "completed_at": self.OLD},
+            {"id": 9, "status": "done", "completed_at": self.OLD},
+        ])
+        task_store.archive_completed(7)
+        task_store.locked_update(lambda d: d["tasks"].append(
+            {"id": task_store.next_id(d), "status": "done", "completed_at": self.OLD}))
+        task_store.archive_completed(7)
+
+        assert [t["id"] for t in self._archived()] == [1, 9, 10]
+        assert json.loads(tf.read_text()) == {"tasks": [], "next_id": 11}
@@ -1,6 +1,8 @@
 """Tests for web_manager.py Flask routes."""
 
 import json
+import subprocess
+import threading
 import pytest
 import task_store
 import web_manager
@@ -57,6 +59,107 @@ class TestBoardRoute:
         resp = client.get("/")
         assert b"blocked 1" not in resp.data
 
+    def test_columns_count_visible_tasks_of_this_account(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [
+            {"id": 1, "status": "pending", "prompt": "Visible A", "priority": "medium"},
+            {"id": 2, "status": "pending", "prompt": "Visible B", "priority": "medium"},
+            {"id": 3, "status": "pending", "prompt": "Hidden C", "priority": "medium", "hidden": True},
+            {"id": 4, "status": "pending", "prompt": "Other D", "priority": "medium", "account": "work"},
+            {"id": 5, "status": "stopped", "prompt": "Stopped E", "priority": "medium"},
+        ]})
+        html = client.get("/").get_data(as_text=True)
+        assert "Visible A" in html and "Visible B" in html
+        assert "Hidden C" not in html and "Other D" not in html
+        assert 'Stopped <span class="count">1</span>' in html
+
+        html = client.get("/?show_hidden=1").get_data(as_text=True)
+        assert "Hidden C" in html
+
+    def test_priority_select_defaults_to_medium(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "x"}]})
+        html = client.get("/").get_data(as_text=True)
+        assert "prio-sel-medium" in html
+        assert '<option value="medium" selected>' in html
+
+    def test_etag_304_until_tasks_change(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "x"}]})
+        etag = client.get("/").headers["ETag"]
+        assert client.get("/", headers={"If-None-Match": etag}).status_code == 304
+        # show_hidden renders a different page
+        assert client.get("/?show_hidden=1", headers={"If-None-Match": etag}).status_code == 200
+
+        client.post("/tasks/1/set-priority", data={"priority": "low"})
+        assert client.get("/", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_board_is_streamed(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": i, "status": "pending", "prompt": f"Task {i}"}
+                                   for i in range(1, 301)]})
+        resp = client.get("/")
+        assert resp.is_streamed
+        html = resp.get_data(as_text=True)
+        assert "#300 Task 300" in html and html.rstrip().endswith("</html>")
+
+    def test_card_labels_are_escaped(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [
+            {"id": 1, "status": "pending", "prompt": "<script>x</script>", "priority": "medium"},
+            {"id": 2, "status": "pending", "prompt": "p", "title": "A & B", "priority": "medium"},
+        ]})
+        html = client.get("/").get_data(as_text=True)
+        assert "#1 &lt;script&gt;x&lt;/script&gt;" in html
+        assert "#2 A &amp; B" in html
+
+
+class TestTemplateCache:
+    """Page templates are compiled once and reused; Flask context processors
+    (e.g. the header's username) still apply."""
+
+    def test_board_compiles_once_and_keeps_context(self, web_client, monkeypatch):
+        client, _ = web_client
+        monkeypatch.setattr(web_manager, "_COMPILED_TEMPLATES", {})
+        compiled = []
+        real_from_string = web_manager.app.jinja_env.from_string
+        monkeypatch.setattr(web_manager.app.jinja_env, "from_string",
+                            lambda src: compiled.append(1) or real_from_string(src))
+        with client.session_transaction() as sess:
+            sess["username"] = "alice"
+
+        first = client.get("/")
+        second = client.get("/")
+
+        assert first.status_code == second.status_code == 200
+        assert len(compiled) == 1
+        assert b"alice" in second.data
+
+    def test_pages_link_stylesheets_instead_of_inlining(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "x"}]})
+        board = client.get("/").get_data(as_text=True)
+        detail = client.get("/tasks/1").get_data(as_text=True)
+        assert web_manager.css_url("app") in board and web_manager.css_url("board") in board
+        assert web_manager.css_url("app") in detail and web_manager.css_url("detail") in detail
+        assert "<style>" not in board and "<style>" not in detail
+        assert "ClaudeXingCode Dashboard" in board
+
+    def test_stylesheets_are_public_and_immutable(self, web_client):
+        client, _ = web_client
+        with client.session_transaction() as sess:
+            sess.clear()
+        resp = client.get(web_manager.css_url("board"))
+        assert resp.status_code == 200
+        assert resp.mimetype == "text/css"
+        assert resp.get_data(as_text=True) == web_manager.BOARD_CSS
+        assert resp.cache_control.max_age == 31536000
+        assert resp.cache_control.immutable
+
+        again = client.get("/css/board.css", headers={"If-None-Match": resp.headers["ETag"]})
+        assert again.status_code == 304
+        assert client.get("/css/nope.css").status_code == 404
+
 
 class TestAddTaskRoute:
     """POST /tasks — create a new task from the web form."""
@@ -73,6 +176,7 @@ class TestAddTaskRoute:
         assert task["prompt"] == "Fix the bug"
         assert task["priority"] == "high"
         assert task["status"] == "pending"
+        assert "." not in task["created_at"]  # second precision, like the dispatcher
         assert task["plan_model"] == "sonnet"
         assert task["exec_model"] == "sonnet"
 
@@ -114,6 +218,12 @@ class TestAddTaskRoute:
         assert resp.status_code == 302
         assert len(json.loads(tf.read_text())["tasks"]) == 0
 
+    def test_empty_title_touches_nothing(self, web_client, monkeypatch):
+        client, _ = web_client
+        monkeypatch.setattr(web_manager, "locked_update",
+                            lambda fn: pytest.fail("locked_update called for an empty title"))
+        assert client.post("/tasks", data={"title": "   ", "prompt": "x"}).status_code == 302
+
 
 class TestTaskDetailRoute:
     def test_returns_task(self, web_client):
@@ -125,11 +235,110 @@ class TestTaskDetailRoute:
         assert resp.status_code == 200
         assert b"Test task" in resp.data
 
+    def test_render_memoized_until_tasks_change(self, web_client, monkeypatch):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "Before"}]})
+        renders = []
+        real = web_manager._render_task_detail
+        monkeypatch.setattr(web_manager, "_render_task_detail",
+                            lambda *a: renders.append(a) or real(*a))
+
+        assert b"Before" in client.get("/tasks/1").data
+        assert b"Before" in client.get("/tasks/1").data
+        assert len(renders) == 1
+
+        client.post("/tasks/1/edit", data={"prompt": "After", "priority": "low"})
+        assert b"After" in client.get("/tasks/1").data
+        assert len(renders) == 2
+
+    @staticmethod
+    def _get_with_racing_save(client, tf, monkeypatch):
+        """GET /tasks/1 while a save lands between the task load and the render."""
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "Before"}]})
+        real = web_manager._check_owner
+
+        def check_then_save(task_id):
+            result = real(task_id)
+            write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "After edit"}]})
+            return result
+
+        with monkeypatch.context() as m:
+            m.setattr(web_manager, "_check_owner", check_then_save)
+            resp = client.get("/tasks/1")
+        assert b"Before" in resp.data
+        return resp
+
+    def test_save_during_load_is_not_memoized_as_current(self, web_client, monkeypatch):
+        client, tf = web_client
+        self._get_with_racing_save(client, tf, monkeypatch)
+        assert b"After edit" in client.get("/tasks/1").data
+
+    def test_save_during_load_not_revalidated_as_current(self, web_client, monkeypatch):
+        client, tf = web_client
+        etag = self._get_with_racing_save(client, tf, monkeypatch).headers["ETag"]
+        resp = client.get("/tasks/1", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert b"After edit" in resp.data
+
+    def test_etag_changes_with_page_templates(self, web_client, monkeypatch):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "a"}]})
+        etag = client.get("/tasks/1").headers["ETag"]
+        monkeypatch.setattr(web_manager, "PAGES_VERSION", "redeployed")
+        assert client.get("/tasks/1", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_concurrent_views_share_small_cache(self, web_client, monkeypatch):
+        """Threaded requests evicting each other's entries never error."""
+        _, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": i, "status": "pending", "prompt": f"t{i}"}
+                                   for i in range(1, 5)]})
+        monkeypatch.setattr(web_manager, "DETAIL_CACHE_SIZE", 1)
+        codes = []
+
+        def worker(task_id):
+            with web_manager.app.test_client() as c:
+                with c.session_transaction() as sess:
+                    sess["account"] = "personal"
+                for _ in range(20):
+                    codes.append(c.get(f"/tasks/{task_id}").status_code)
+
+        threads = [threading.Thread(target=worker, args=(i % 4 + 1,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert codes == [200] * 160
+
+    def test_etag_304_is_per_task(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "a"},
+                                   {"id": 2, "status": "pending", "prompt": "b"}]})
+        etag = client.get("/tasks/1").headers["ETag"]
+        assert client.get("/tasks/1", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/tasks/2", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_session_durations_formatted(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "done", "prompt": "x", "sessions": [
+            {"started_at": "2024-01-01T00:00:00+00:00", "duration_s": 3725, "exit_code": 0},
+            {"started_at": "2024-01-01T00:00:00+00:00", "duration_s": 125, "exit_code": 0},
+            {"started_at": "2024-01-01T00:00:00+00:00", "duration_s": 9, "exit_code": 0},
+        ]}]})
+        html = client.get("/tasks/1").get_data(as_text=True)
+        assert "1h2m" in html and "2m5s" in html and "9s" in html
+
     def test_404_not_found(self, web_client):
         client, _ = web_client
         resp = client.get("/tasks/999")
         assert resp.status_code == 404
 
+    def test_403_other_account(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "Not mine",
+                                    "priority": "medium", "account": "work"}]})
+        resp = client.get("/tasks/1")
+        assert resp.status_code == 403
+
     def test_subtask_blocked_on_shown_in_detail(self, web_client):
         client, tf = web_client
         write_tasks(tf, {"tasks": [
@@ -279,6 +488,30 @@ class TestRejectRoute:
         assert task["status"] == "pending"
         assert "stop_reason" not in task
 
+    def test_reject_wrong_status_leaves_file_untouched(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "x"}]})
+        before = tf.stat().st_mtime_ns
+        client.post("/tasks/1/reject", data={"feedback": "late"})
+        assert tf.stat().st_mtime_ns == before
+        assert "rejection_comments" not in json.loads(tf.read_text())["tasks"][0]
+
+    def test_unchanged_values_skip_the_write_and_log(self, web_client, monkeypatch):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "x",
+                                    "priority": "high", "hidden": True,
+                                    "plan_model": "opus", "exec_model": "sonnet"}]})
+        logged = []
+        monkeypatch.setattr(web_manager, "log_progress", lambda *a: logged.append(a))
+        before = tf.stat().st_ino
+        client.post("/tasks/1/hide")
+        client.post("/tasks/1/set-priority", data={"priority": "high"})
+        client.post("/tasks/1/set-model", data={"plan_model": "opus", "exec_model": "sonnet"})
+        client.post("/tasks/1/edit", data={"prompt": "x", "priority": "high",
+                                          "plan_model": "opus", "exec_model": "sonnet"})
+        assert tf.stat().st_ino == before
+        assert logged == []
+
     def test_rejects_clears_plan(self, web_client):
         client, tf = web_client
         write_tasks(tf, {"tasks": [{"id": 1, "status": "plan_review", "prompt": "x",
@@ -316,6 +549,17 @@ class TestRejectRoute:
         task = json.loads(tf.read_text())["tasks"][0]
         assert task["rejection_comments"] == [{"round": 1, "comment": ""}]
 
+    def test_rejects_clips_oversized_feedback(self, web_client, monkeypatch):
+        monkeypatch.setattr(task_store, "MAX_TEXT_CHARS", 100)
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "plan_review", "prompt": "x",
+                                    "priority": "medium", "plan": "p"}]})
+        client.post("/tasks/1/reject", data={"feedback": "z" * 1000})
+
+        comment = json.loads(tf.read_text())["tasks"][0]["rejection_comments"][0]["comment"]
+        assert len(comment) == 100
+        assert comment.endswith("chars]")
+
 
 class TestCancelRoute:
     """Cancel is allowed from both in_progress and plan_review states."""
@@ -436,6 +680,12 @@ class TestDeleteRoute:
         client.post("/tasks/1/delete")
         assert len(json.loads(tf.read_text())["tasks"]) == 1
 
+    def test_deletes_only_target_and_keeps_order(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": i, "status": "pending", "prompt": "x"} for i in (1, 2, 3)]})
+        client.post("/tasks/2/delete")
+        assert [t["id"] for t in json.loads(tf.read_text())["tasks"]] == [1, 3]
+
 
 class TestSetModelRoute:
     """POST /tasks/<id>/set-model — updates plan_model and/or exec_model.
@@ -518,6 +768,12 @@ class TestEditTaskModels:
         assert task["exec_model"] == "haiku"
         assert task["priority"] == "high"
 
+    def test_edit_rejects_unknown_priority(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "x", "priority": "high"}]})
+        client.post("/tasks/1/edit", data={"prompt": "x", "priority": "<urgent>"})
+        assert json.loads(tf.read_text())["tasks"][0]["priority"] == "medium"
+
     def test_edit_blocked_for_in_progress(self, web_client):
         client, tf = web_client
         write_tasks(tf, {"tasks": [{"id": 1, "status": "in_progress", "prompt": "x",
@@ -636,6 +892,52 @@ class TestArtifactRendering:
         assert b"agent_log/tasks/task_1/document_1.md" in resp.data
 
 
+class TestApiTasksRoute:
+    """GET /api/tasks — polled by open pages; ETag revalidation."""
+
+    def test_returns_account_tasks_and_dispatcher(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [
+            {"id": 1, "status": "pending", "prompt": "mine"},
+            {"id": 2, "status": "pending", "prompt": "theirs", "account": "work"},
+        ]})
+        body = client.get("/api/tasks").get_json()
+        assert [t["id"] for t in body["tasks"]] == [1]
+        assert body["dispatcher"]["state"] == "idle"
+
+    def test_304_until_tasks_change(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [{"id": 1, "status": "pending", "prompt": "x"}]})
+        etag = client.get("/api/tasks").headers["ETag"]
+        assert client.get("/api/tasks", headers={"If-None-Match": etag}).status_code == 304
+
+        client.post("/tasks/1/delete")
+        resp = client.get("/api/tasks", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.get_json()["tasks"] == []
+
+    def test_etag_differs_per_account(self, web_client):
+        client, _ = web_client
+        etag = client.get("/api/tasks").headers["ETag"]
+        with client.session_transaction() as sess:
+            sess["account"] = "work"
+        assert client.get("/api/tasks", headers={"If-None-Match": etag}).status_code == 200
+
+
+class TestExportRoute:
+    def test_exports_account_tasks_indented(self, web_client):
+        client, tf = web_client
+        write_tasks(tf, {"tasks": [
+            {"id": 1, "status": "pending", "prompt": "mine"},
+            {"id": 2, "status": "pending", "prompt": "theirs", "account": "work"},
+        ]})
+        resp = client.get("/tasks/export")
+        text = resp.get_data(as_text=True)
+        assert resp.mimetype == "application/json"
+        assert '\n  "tasks"' in text and text.endswith("\n")
+        assert [t["id"] for t in json.loads(text)["tasks"]] == [1]
+
+
 class TestStatusRoute:
     def test_returns_idle_when_no_file(self, web_client):
         client, _ = web_client
@@ -643,6 +945,130 @@ class TestStatusRoute:
         assert resp.status_code == 200
         assert resp.get_json()["state"] == "idle"
 
+    def test_reads_file_and_picks_up_rewrites(self, web_client, tmp_path):
+        client, _ = web_client
+        sf = tmp_path / "status.json"
+        sf.write_text(json.dumps({"state": "running", "label": "Planning #1"}))
+        assert client.get("/status").get_json()["label"] == "Planning #1"
+        first = web_manager._read_dispatcher_status()
+        assert web_manager._read_dispatcher_status() is first  # cached while unchanged
+
+        sf.write_text(json.dumps({"state": "idle", "label": "Idle — no actionable tasks"}))
+        assert client.get("/status").get_json()["state"] == "idle"
+
+    def test_serves_status_file_bytes_verbatim(self, web_client, tmp_path):
+        client, _ = web_client
+        raw = b'{"state":"running","label":"Executing #7"}'
+        (tmp_path / "status.json").write_bytes(raw)
+        resp = client.get("/status")
+        assert resp.mimetype == "application/json"
+        assert resp.data == raw
+
+    def test_etag_revalidation_returns_304(self, web_client, tmp_path):
+        client, _ = web_client
+        sf = tmp_path / "status.json"
+        sf.write_text(json.dumps({"state": "running", "label": "Executing #2"}))
+        first = client.get("/status")
+        etag = first.headers["ETag"]
+        assert "max-age=2" in first.headers["Cache-Control"]
+
+        again = client.get("/status", headers={"If-None-Match": etag})
+        assert again.status_code == 304
+        assert again.data == b""
+
+        sf.write_text(json.dumps({"state": "idle", "label": "Idle"}))
+        changed = client.get("/status", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.get_json()["state"] == "idle"
+
+    def test_corrupt_file_reports_idle(self, web_client, tmp_path):
+        client, _ = web_client
+        (tmp_path / "status.json").write_text("{not json")
+        assert client.get("/status").get_json()["state"] == "idle"
+
+
+class TestProgressRoute:
+    """GET /progress — escaped log cached per file stat, ETag revalidation."""
+
+    @pytest.fixture
+    def progress_file(self, tmp_path, monkeypatch):
+        pf = tmp_path / "agent_log.md"
+        monkeypatch.setattr(web_manager, "PROGRESS_FILE", pf)
+        monkeypatch.setattr(web_manager, "_PROGRESS_CACHE", {"key": None, "content": ""})
+        return pf
+
+    def test_empty_when_missing(self, web_client, progress_file):
+        client, _ = web_client
+        assert b"No progress entries yet." in client.get("/progress").data
+
+    def test_content_is_escaped(self, web_client, progress_file):
+        client, _ = web_client
+        progress_file.write_text("task #1 <done>")
+        resp = client.get("/progress")
+        assert b"task #1 &lt;done&gt;" in resp.data
+
+    def test_etag_304_until_file_changes(self, web_client, progress_file):
+        client, _ = web_client
+        progress_file.write_text("first entry")
+        etag = client.get("/progress").headers["ETag"]
+        assert client.get("/progress", headers={"If-None-Match": etag}).status_code == 304
+
+        progress_file.write_text("second entry, longer")
+        resp = client.get("/progress", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert b"second entry" in resp.data
+
+
+class TestGitLogRoute:
+    """GET /log — git log output is cached per HEAD state."""
+
+    @pytest.fixture
+    def git_calls(self, tmp_path, monkeypatch):
+        git_dir = tmp_path / "ws" / ".git"
+        (git_dir / "refs" / "heads").mkdir(parents=True)
+        (git_dir / "HEAD").write_text("ref: refs/heads/main\n")
+        (git_dir / "refs" / "heads" / "main").write_text("a" * 40 + "\n")
+        monkeypatch.setattr(web_manager, "WORKSPACE", tmp_path / "ws")
+        monkeypatch.setattr(web_manager, "_GIT_LOG_CACHE", {"key": None, "output": "", "at": 0.0})
+        calls = []
+
+        def fake_run(cmd, **kwargs):
+            calls.append(cmd)
+            return subprocess.CompletedProcess(cmd, 0, stdout=f"* commit {len(calls)}\n".encode())
+
+        monkeypatch.setattr(web_manager.subprocess, "run", fake_run)
+        return calls, git_dir
+
+    def test_repeat_views_reuse_output(self, web_client, git_calls):
+        client, _ = web_client
+        calls, _ = git_calls
+        assert b"commit 1" in client.get("/log").data
+        assert b"commit 1" in client.get("/log").data
+        assert len(calls) == 1
+
+    def test_new_commit_invalidates(self, web_client, git_calls):
+        client, _ = web_client
+        calls, git_dir = git_calls
+        client.get("/log")
+        (git_dir / "refs" / "heads" / "main").write_text("b" * 41 + "\n")
+        assert b"commit 2" in client.get("/log").data
+
+    def test_non_utf8_output_is_escaped_not_fatal(self, web_client, git_calls, monkeypatch):
+        client, _ = web_client
+        monkeypatch.setattr(web_manager.subprocess, "run", lambda cmd, **kw: subprocess.CompletedProcess(
+            cmd, 0, stdout=b"* abc <b>caf\xe9</b>\n"))
+        resp = client.get("/log")
+        assert resp.status_code == 200
+        assert "* abc &lt;b&gt;caf\ufffd&lt;/b&gt;" in resp.get_data(as_text=True)
+
+    def test_ttl_expiry_reruns(self, web_client, git_calls, monkeypatch):
+        client, _ = web_client
+        calls, _ = git_calls
+        client.get("/log")
+        monkeypatch.setattr(web_manager, "GIT_LOG_TTL", 0)
+        client.get("/log")
+        assert len(calls) == 2
+
 
 class TestReportDisplay:
     """GET /tasks/<id> — Report section visibility based on task.report field."""
@@ -21,21 +21,37 @@ import os
 import shutil
 import sys
 import subprocess
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # stdlib fallback
+    orjson = None
+
 _AGENT_DIR = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(_AGENT_DIR / "core"))
 
 import hashlib
-from functools import wraps
-from flask import Flask, redirect, render_template_string, request, url_for, jsonify, session
-from markupsafe import Markup
+from functools import lru_cache, wraps
+from flask import Flask, redirect, request, url_for, jsonify, session
+from jinja2 import DictLoader
+from markupsafe import Markup, escape
 import markdown as _markdown
 from werkzeug.security import check_password_hash
 from progress_logger import log_progress
-from task_store import load_tasks, save_tasks, locked_update, next_id, TASKS_FILE, STATUS_FILE, DEFAULT_ACCOUNT
+from task_store import load_tasks, load_tasks_indexed, load_children_index, tasks_etag, locked_update, next_id, clip_text, TASKS_FILE, STATUS_FILE, DEFAULT_ACCOUNT
+
+
+def _json_loads(raw):
+    """Parse JSON (str or bytes) with orjson when available.
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the latter."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
 
 _ACCOUNTS_FILE = _AGENT_DIR / "accounts.json"
 
@@ -53,6 +69,10 @@ WORKSPACE = Path(os.environ.get("WORKSPACE", _DEFAULT_WORKSPACE))
 PROGRESS_FILE = WORKSPACE / "agent_log" / "agent_log.md"
 
 app = Flask(__name__)
+# Every template is a module-level string (compiled once by _render; partials
+# via DictLoader), so there is nothing on disk for Jinja to re-check, even
+# when the app runs with debug on.
+app.config["TEMPLATES_AUTO_RELOAD"] = False
 
 # Derive a stable secret key from the OAuth token so sessions survive restarts.
 # Override with FLASK_SECRET_KEY env var if needed.
@@ -72,7 +92,7 @@ def _inject_user():
 @app.before_request
 def _require_auth():
     """Redirect unauthenticated requests to /login. API routes get JSON 401."""
-    if request.endpoint in ("login", "logout", "static"):
+    if request.endpoint in ("login", "logout", "static", "stylesheet"):
         return None
     if "account" not in session:
         if request.path.startswith("/api/") or request.path == "/status":
@@ -83,8 +103,8 @@ def _require_auth():
 def _check_owner(task_id: int):
     """Return (task, error) — error is a (message, code) tuple or None."""
     acc = session.get("account", DEFAULT_ACCOUNT)
-    data = load_tasks()
-    task = next((t for t in data["tasks"] if t["id"] == task_id), None)
+    _, by_id = load_tasks_indexed()
+    task = by_id.get(task_id)
     if task is None:
         return None, ("Task not found", 404)
     if task.get("account", DEFAULT_ACCOUNT) != acc:
@@ -92,6 +112,32 @@ def _check_owner(task_id: int):
     return task, None
 
 
+PRIORITIES = ("high", "medium", "low")
+MODELS = ("sonnet", "opus", "haiku")
+
+
+def _form_choice(field: str, choices: tuple, default: str) -> str:
+    """Form value for field if it is one of choices, else default. Returns the
+    constant from choices, so stored values are the shared interned strings."""
+    value = request.form.get(field, default)
+    for choice in choices:
+        if value == choice:
+            return choice
+    return default
+
+
+def _find_task(data: dict, task_id: int) -> dict | None:
+    """Return the task with the given id from a loaded data dict, or None.
+    For locked_update closures, which get a fresh read rather than the cached
+    index; stops at the first match since ids are unique."""
+    return next((t for t in data["tasks"] if t["id"] == task_id), None)
+
+
+def _utc_now_iso() -> str:
+    """Current UTC time for tasks.json — second precision, matching the dispatcher."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
 _PT = ZoneInfo("America/Los_Angeles")
 
 @app.template_filter("md")
@@ -101,6 +147,26 @@ def render_md(text):
         return ""
     return Markup(_markdown.markdown(str(text), extensions=["tables", "fenced_code"]))
 
+@lru_cache(maxsize=4096)
+def _escape_cached(text: str) -> Markup:
+    return escape(text)
+
+@app.template_filter("card_label")
+def card_label(task):
+    """Escaped board-card label (title, else prompt). Memoized by text, so a
+    board re-render only escapes labels that changed since the last one."""
+    return _escape_cached(str(task.get("title") or task.get("prompt", "")))
+
+@app.template_filter("duration")
+def fmt_duration(seconds):
+    """Format a session's duration_s compactly: 1h2m, 3m4s or 5s."""
+    d = int(seconds or 0)
+    if d >= 3600:
+        return f"{d // 3600}h{d % 3600 // 60}m"
+    if d >= 60:
+        return f"{d // 60}m{d % 60}s"
+    return f"{d}s"
+
 @app.template_filter("pt")
 def to_pt(ts):
     """Convert an ISO timestamp string to Pacific time, formatted as YYYY-MM-DD HH:MM:SS PT."""
@@ -211,21 +277,15 @@ fetch('/status').then(r=>r.json()).then(d=>{
 </script>
 """
 
+# Pages pull the header in with {% include "header.html" %} instead of each
+# page template embedding it.
+app.jinja_loader = DictLoader({"header.html": HEADER_HTML})
+
 # ---------------------------------------------------------------------------
 # Templates
 # ---------------------------------------------------------------------------
 
-BOARD_HTML = """
-{% macro priority_select(t) %}<form method="post" action="/tasks/{{ t.id }}/set-priority" style="margin:0;display:inline"><select name="priority" onchange="this.form.submit()" class="prio-select prio-sel-{{ t.get('priority','medium') }}"><option value="high" {% if t.get('priority')=='high' %}selected{% endif %}>high</option><option value="medium" {% if t.get('priority','medium')=='medium' %}selected{% endif %}>medium</option><option value="low" {% if t.get('priority')=='low' %}selected{% endif %}>low</option></select></form>{% endmacro %}
-<!doctype html>
-<html lang="en">
-<head>
-  <meta charset="utf-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1">
-  <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>⭐</text></svg>">
-  <title>ClaudeXingCode Dashboard</title>
-  <style>
-    """ + SHARED_CSS + """
+BOARD_CSS = """
     /* --- Board layout --- */
     .add-card { background: var(--surface); border-bottom: 1px solid var(--border);
                 padding: 0.85rem 1rem; }
@@ -351,10 +411,22 @@ BOARD_HTML = """
       .offramp { flex-direction: column; padding: 0 0.75rem 1rem; }
       .offramp .col { max-width: 100%; }
     }
-  </style>
+"""
+
+BOARD_HTML = """
+{% macro priority_select(t) %}{% set prio = t.get('priority','medium') %}<form method="post" action="/tasks/{{ t.id }}/set-priority" style="margin:0;display:inline"><select name="priority" onchange="this.form.submit()" class="prio-select prio-sel-{{ prio }}"><option value="high" {% if prio=='high' %}selected{% endif %}>high</option><option value="medium" {% if prio=='medium' %}selected{% endif %}>medium</option><option value="low" {% if prio=='low' %}selected{% endif %}>low</option></select></form>{% endmacro %}
+<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>⭐</text></svg>">
+  <title>ClaudeXingCode Dashboard</title>
+  <link rel="stylesheet" href="{{ css_url('app') }}">
+  <link rel="stylesheet" href="{{ css_url('board') }}">
 </head>
 <body>
-""" + HEADER_HTML + """
+{% include "header.html" %}
 
 <div class="add-card">
   <div class="add-title">New Task</div>
@@ -410,11 +482,12 @@ BOARD_HTML = """
     <h2>
       {% if col_icon %}<span class="gate-icon">{{ col_icon }}</span>{% endif %}
       {{ col_label }}
-      <span class="count">{{ tasks|selectattr('status','equalto',col_status)|list|length }}</span>
+      {% set col_tasks = groups.get(col_status, []) %}
+      <span class="count">{{ col_tasks|length }}</span>
     </h2>
-    {% for t in tasks if t.status == col_status %}
+    {% for t in col_tasks %}
     <div class="card{% if t.get('hidden') %} hidden-card{% endif %}{% if t.status == 'plan_review' %} card-review{% endif %}">
-      <a class="card-link" href="/tasks/{{ t.id }}">#{{ t.id }} {{ t.get('title') or t.prompt }}</a>
+      <a class="card-link" href="/tasks/{{ t.id }}">#{{ t.id }} {{ t | card_label }}</a>
       <div class="meta">
         {{ priority_select(t) }}
         <span class="badge badge-model">P:{{ t.get('plan_model', t.get('model','sonnet')) }}</span>
@@ -439,15 +512,15 @@ BOARD_HTML = """
 </div>
 
 {# --- Off-ramp: stopped & decomposed (always visible) --- #}
-{% set stopped_tasks = tasks|selectattr('status','equalto','stopped')|list %}
-{% set decomposed_tasks = tasks|selectattr('status','equalto','decomposed')|list %}
+{% set stopped_tasks = groups.get('stopped', []) %}
+{% set decomposed_tasks = groups.get('decomposed', []) %}
 <div class="section-label">Off-ramp</div>
 <div class="offramp">
   <div class="col col-stopped">
     <h2>Stopped <span class="count">{{ stopped_tasks|length }}</span></h2>
     {% for t in stopped_tasks %}
     <div class="card{% if t.get('hidden') %} hidden-card{% endif %}">
-      <a class="card-link" href="/tasks/{{ t.id }}">#{{ t.id }} {{ t.get('title') or t.prompt }}</a>
+      <a class="card-link" href="/tasks/{{ t.id }}">#{{ t.id }} {{ t | card_label }}</a>
       <div class="meta">
         {{ priority_select(t) }}
         {% if t.get('stop_reason') %}<span class="reason-tag">{{ t.stop_reason }}</span>{% endif %}
@@ -466,7 +539,7 @@ BOARD_HTML = """
     <h2>Decomposed <span class="count">{{ decomposed_tasks|length }}</span></h2>
     {% for t in decomposed_tasks %}
     <div class="card{% if t.get('hidden') %} hidden-card{% endif %}">
-      <a class="card-link" href="/tasks/{{ t.id }}">#{{ t.id }} {{ t.get('title') or t.prompt }}</a>
+      <a class="card-link" href="/tasks/{{ t.id }}">#{{ t.id }} {{ t | card_label }}</a>
       <div class="meta">
         {{ priority_select(t) }}
         {% if t.get('hidden') %}
@@ -527,30 +600,32 @@ BOARD_HTML = """
     return '<div class="' + cardCls + '"><a class="card-link" href="/tasks/' + t.id + '">#' + t.id + ' ' + esc(display) + '</a><div class="meta">' + meta + '</div></div>';
   }
 
-  function renderCol(tasks, status) {
-    const items = tasks.filter(t => t.status === status);
+  function renderCol(items) {
     if (items.length === 0) return '<div style="color:var(--text-subtle);font-size:0.75rem;padding:0.2rem 0">&mdash;</div>';
     return items.map(renderCard).join('');
   }
 
   function updateBoard(data) {
     const tasks = showHidden ? data.tasks : data.tasks.filter(t => !t.hidden);
+    // Bucket by status once, like the server-side render, instead of
+    // filtering the full list twice per column.
+    const groups = {};
+    tasks.forEach(function(t) { (groups[t.status] = groups[t.status] || []).push(t); });
 
     // Update pipeline columns
     const pipeline = document.querySelector('.pipeline');
     if (pipeline) {
       const cols = pipeline.querySelectorAll('.col');
       PIPELINE_COLS.forEach(function(colDef, i) {
-        const status = colDef[0];
-        const count = tasks.filter(t => t.status === status).length;
+        const items = groups[colDef[0]] || [];
         if (cols[i]) {
           const h2 = cols[i].querySelector('h2');
           if (h2) {
             const countSpan = h2.querySelector('.count');
-            if (countSpan) countSpan.textContent = count;
+            if (countSpan) countSpan.textContent = items.length;
           }
           while (cols[i].children.length > 1) cols[i].children[1].remove();
-          cols[i].insertAdjacentHTML('beforeend', renderCol(tasks, status));
+          cols[i].insertAdjacentHTML('beforeend', renderCol(items));
         }
       });
     }
@@ -560,7 +635,7 @@ BOARD_HTML = """
     if (offramp) {
       const offCols = offramp.querySelectorAll('.col');
       ['stopped', 'decomposed'].forEach(function(status, i) {
-        const items = tasks.filter(t => t.status === status);
+        const items = groups[status] || [];
         if (offCols[i]) {
           const h2 = offCols[i].querySelector('h2');
           if (h2) {
@@ -568,7 +643,7 @@ BOARD_HTML = """
             if (countSpan) countSpan.textContent = items.length;
           }
           while (offCols[i].children.length > 1) offCols[i].children[1].remove();
-          offCols[i].insertAdjacentHTML('beforeend', renderCol(tasks, status));
+          offCols[i].insertAdjacentHTML('beforeend', renderCol(items));
         }
       });
     }
@@ -606,8 +681,14 @@ BOARD_HTML = """
     }
   }
 
+  let lastTag = null;
   function poll() {
-    fetch('/api/tasks').then(r => r.json()).then(updateBoard).catch(() => {});
+    fetch('/api/tasks').then(function(r) {
+      const tag = r.headers.get('ETag');
+      if (tag && tag === lastTag) return;  // unchanged since the last redraw
+      lastTag = tag;
+      return r.json().then(updateBoard);
+    }).catch(() => {});
     setTimeout(poll, POLL_MS);
   }
   setTimeout(poll, POLL_MS);
@@ -629,16 +710,7 @@ BOARD_HTML = """
 </html>
 """
 
-DETAIL_HTML = """
-<!doctype html>
-<html lang="en">
-<head>
-  <meta charset="utf-8">
-  <meta name="viewport" content="width=device-width, initial-scale=1">
-  <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>⭐</text></svg>">
-  <title>Task #{{ task.id }}</title>
-  <style>
-    """ + SHARED_CSS + """
+DETAIL_CSS = """
     .content { padding: 1rem; max-width: 1200px; margin: 0 auto; }
     .back-link { font-size: 0.82rem; color: var(--text-muted); }
     .back-link:hover { color: var(--text); }
@@ -763,12 +835,24 @@ DETAIL_HTML = """
       .detail-cols { flex-direction: column; }
       .detail-right { flex: 0 0 auto; width: 100%; }
     }
-  </style>
+"""
+
+DETAIL_HTML = """
+<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>⭐</text></svg>">
+  <title>Task #{{ task.id }}</title>
+  <link rel="stylesheet" href="{{ css_url('app') }}">
+  <link rel="stylesheet" href="{{ css_url('detail') }}">
 </head>
 <body>
-""" + HEADER_HTML + """
+{% include "header.html" %}
 <div class="content">
 <a href="/" class="back-link">&larr; Board</a>
+{% set prio = task.get('priority','medium') %}
 <h1 class="task-title">#{{ task.id }} &mdash; {{ task.get('title') or task.prompt }}</h1>
 {% if task.get('title') and task.get('title') != task.prompt %}
 <p class="task-prompt">{{ task.prompt }}</p>
@@ -793,9 +877,9 @@ DETAIL_HTML = """
         <div class="edit-row">
           <span class="inline-label">Priority</span>
           <select name="priority">
-            <option value="high" {% if task.get('priority')=='high' %}selected{% endif %}>High</option>
-            <option value="medium" {% if task.get('priority','medium')=='medium' %}selected{% endif %}>Medium</option>
-            <option value="low" {% if task.get('priority')=='low' %}selected{% endif %}>Low</option>
+            <option value="high" {% if prio=='high' %}selected{% endif %}>High</option>
+            <option value="medium" {% if prio=='medium' %}selected{% endif %}>Medium</option>
+            <option value="low" {% if prio=='low' %}selected{% endif %}>Low</option>
           </select>
           <span class="inline-label">Plan</span>
           <select name="plan_model">
@@ -931,7 +1015,7 @@ DETAIL_HTML = """
       </div>
       <div class="meta-grid">
         <span class="meta-key">Priority</span>
-        <span class="meta-val">{{ task.get('priority','medium') }}</span>
+        <span class="meta-val">{{ prio }}</span>
         {% set pm = task.get('plan_model', task.get('model','sonnet')) %}
         {% set em = task.get('exec_model', task.get('model','sonnet')) %}
         <span class="meta-key">Models</span>
@@ -964,9 +1048,10 @@ DETAIL_HTML = """
         <span class="meta-key">Parent</span>
         <span class="meta-val"><a href="/tasks/{{ task.parent }}">#{{ task.parent }}</a></span>
         {% endif %}
-        {% if task.get('created_at') %}
+        {% set created = task.get('created_at') %}
+        {% if created %}
         <span class="meta-key">Created</span>
-        <span class="timestamp">{{ task.created_at[:19] }}</span>
+        <span class="timestamp">{{ created[:19] }}</span>
         {% endif %}
         {% if task.get('completed_at') %}
         <span class="meta-key">Completed</span>
@@ -1043,10 +1128,7 @@ DETAIL_HTML = """
             <td>{{ loop.index }}</td>
             <td>{{ s.get('started_at') | pt }}</td>
             <td>
-              {% set dur = s.get('duration_s', 0) %}
-              {% if dur >= 3600 %}{{ (dur // 3600) }}h{{ ((dur % 3600) // 60) }}m
-              {% elif dur >= 60 %}{{ (dur // 60) }}m{{ (dur % 60) }}s
-              {% else %}{{ dur }}s{% endif %}
+              {{ s.get('duration_s', 0) | duration }}
             </td>
             <td>
               {% if rl %}⚠ rate limited
@@ -1075,8 +1157,15 @@ DETAIL_HTML = """
     const d = document.createElement('div'); d.textContent = s; return d.innerHTML;
   }
 
+  let lastTag = null;
   function poll() {
-    fetch('/api/tasks').then(r => r.json()).then(function(data) {
+    fetch('/api/tasks').then(function(r) {
+      const tag = r.headers.get('ETag');
+      if (tag && tag === lastTag) return null;  // unchanged since the last poll
+      lastTag = tag;
+      return r.json();
+    }).then(function(data) {
+      if (!data) return;
       const task = data.tasks.find(t => t.id === TASK_ID);
       if (task && task.status !== lastStatus) {
         // Status changed — reload the page to get fresh server-rendered content
@@ -1116,8 +1205,8 @@ PROGRESS_HTML = """
   <meta name="viewport" content="width=device-width, initial-scale=1">
   <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>⭐</text></svg>">
   <title>Progress Log</title>
+  <link rel="stylesheet" href="{{ css_url('app') }}">
   <style>
-    """ + SHARED_CSS + """
     .content { padding: 1rem; max-width: 960px; margin: 0 auto; }
     pre { background: #1e2433; color: #e2e8f0; padding: 1rem; border-radius: var(--radius);
           overflow-x: auto; font-size: 0.78rem; white-space: pre-wrap; line-height: 1.6; }
@@ -1125,7 +1214,7 @@ PROGRESS_HTML = """
   </style>
 </head>
 <body>
-""" + HEADER_HTML + """
+{% include "header.html" %}
 <div class="content">
 <h1 style="font-size:1.1rem;margin:0.75rem 0">Agent Task Log</h1>
 {% if content %}
@@ -1146,8 +1235,8 @@ LOG_HTML = """
   <meta name="viewport" content="width=device-width, initial-scale=1">
   <link rel="icon" href="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>⭐</text></svg>">
   <title>Git Log</title>
+  <link rel="stylesheet" href="{{ css_url('app') }}">
   <style>
-    """ + SHARED_CSS + """
     .content { padding: 1rem; max-width: 960px; margin: 0 auto; }
     pre { background: #1e2433; color: #e2e8f0; padding: 1rem; border-radius: var(--radius);
           overflow-x: auto; font-size: 0.78rem; white-space: pre-wrap; line-height: 1.6; }
@@ -1155,7 +1244,7 @@ LOG_HTML = """
   </style>
 </head>
 <body>
-""" + HEADER_HTML + """
+{% include "header.html" %}
 <div class="content">
 <h1 style="font-size:1.1rem;margin:0.75rem 0">Recent Git Log</h1>
 {% if log_output %}
@@ -1173,14 +1262,134 @@ LOG_HTML = """
 # Helpers
 # ---------------------------------------------------------------------------
 
+# Parsed dispatcher status keyed by (path, inode, size, mtime_ns) — the same
+# invalidation scheme as task_store's tasks cache. Every page's header polls
+# /status, but the dispatcher only rewrites the file on state changes. The
+# validated raw bytes are kept too so /status can ship them without a
+# parse/re-serialize round-trip.
+_STATUS_CACHE = {"key": None, "data": None, "raw": b""}
+_IDLE_JSON = json.dumps({"state": "idle", "label": "Idle"}).encode()
+
+
 def _read_dispatcher_status() -> dict:
-    """Read dispatcher status from file, falling back to idle."""
-    if STATUS_FILE.exists():
+    """Read dispatcher status from file, falling back to idle.
+    Re-parses only when the file changed; the returned dict is shared (read-only)."""
+    try:
+        st = STATUS_FILE.stat()
+    except OSError:
+        return {"state": "idle", "label": "Idle"}
+    key = (str(STATUS_FILE), st.st_ino, st.st_size, st.st_mtime_ns)
+    if key == _STATUS_CACHE["key"]:
+        return _STATUS_CACHE["data"]
+    try:
+        raw = STATUS_FILE.read_bytes()
+        data = _json_loads(raw)
+    except (json.JSONDecodeError, OSError):
+        return {"state": "idle", "label": "Idle"}
+    _STATUS_CACHE["key"] = key
+    _STATUS_CACHE["data"] = data
+    _STATUS_CACHE["raw"] = raw
+    return data
+
+
+def _status_etag() -> str:
+    """Validator for the dispatcher status file: its (mtime, size), or "idle"."""
+    try:
+        st = STATUS_FILE.stat()
+    except OSError:
+        return "idle"
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+
+def _dispatcher_status_json() -> bytes:
+    """Dispatcher status as JSON bytes — the status file verbatim once it has
+    parsed, or the idle fallback."""
+    data = _read_dispatcher_status()
+    if data is _STATUS_CACHE["data"]:
+        return _STATUS_CACHE["raw"]
+    return _IDLE_JSON
+
+
+# HTML-escaped progress log keyed by the file's stat, so /progress only reads
+# and escapes agent_log.md when the progress logger has rewritten it.
+_PROGRESS_CACHE = {"key": None, "content": Markup("")}
+
+
+def _progress_key():
+    """(inode, size, mtime_ns) of PROGRESS_FILE, or None if it doesn't exist."""
+    try:
+        st = PROGRESS_FILE.stat()
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _read_progress(key) -> Markup:
+    """Escaped progress log for the given _progress_key(), cached per key."""
+    if key is None:
+        return Markup("")
+    if key != _PROGRESS_CACHE["key"]:
         try:
-            return json.loads(STATUS_FILE.read_text())
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {"state": "idle", "label": "Idle"}
+            content = escape(PROGRESS_FILE.read_text())
+        except OSError:
+            return Markup("")
+        _PROGRESS_CACHE["key"] = key
+        _PROGRESS_CACHE["content"] = content
+    return _PROGRESS_CACHE["content"]
+
+
+# `git log` output for /log, keyed by the HEAD state of the workspace repo
+# (HEAD contents plus the stat of the branch ref and packed-refs). Reused for
+# up to GIT_LOG_TTL seconds so page views don't fork git each time; the TTL
+# bounds staleness from refs that the key doesn't cover (other branches/tags
+# in --decorate).
+GIT_LOG_TTL = 5.0
+_GIT_LOG_CACHE = {"key": None, "output": Markup(""), "at": 0.0}
+
+
+def _git_head_key():
+    """Cheap fingerprint of the workspace HEAD, or None if it can't be read."""
+    git_dir = WORKSPACE / ".git"
+    try:
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        return None
+    key = [head]
+    paths = [git_dir / "packed-refs"]
+    if head.startswith("ref: "):
+        paths.append(git_dir / head[5:])
+    for path in paths:
+        try:
+            st = path.stat()
+            key.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        except OSError:
+            key.append(None)
+    return tuple(key)
+
+
+def _read_git_log() -> Markup:
+    """Return recent `git log --graph` output for WORKSPACE, HTML-escaped and
+    cached per HEAD state."""
+    key = _git_head_key()
+    now = time.monotonic()
+    if (key is not None and key == _GIT_LOG_CACHE["key"]
+            and now - _GIT_LOG_CACHE["at"] < GIT_LOG_TTL):
+        return _GIT_LOG_CACHE["output"]
+    log_output = Markup("")
+    try:
+        # Raw bytes, decoded once leniently: a non-UTF-8 commit message must
+        # not turn the page into a 500. stderr is never shown, so not captured.
+        result = subprocess.run(
+            ["git", "log", "--oneline", "--graph", "--decorate", "-30"],
+            cwd=str(WORKSPACE),
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=10,
+        )
+        if result.returncode == 0:
+            log_output = escape(result.stdout.decode("utf-8", errors="replace"))
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        pass
+    _GIT_LOG_CACHE.update(key=key, output=log_output, at=now)
+    return log_output
 
 
 # ---------------------------------------------------------------------------
@@ -1196,6 +1405,7 @@ PIPELINE_COLS = [
     ("executing",    "Executing",   ""),
     ("done",         "Done",        ""),
 ]
+PIPELINE_COLS_JSON = json.dumps(PIPELINE_COLS)
 
 
 LOGIN_HTML = """<!DOCTYPE html>
@@ -1260,6 +1470,95 @@ LOGIN_HTML = """<!DOCTYPE html>
 </html>"""
 
 
+# Stylesheets served from /css/<name>.css instead of inlined into every page
+# response. URLs carry a content hash (?v=...), so browsers cache them for a
+# year and a deploy that changes the CSS gets a new URL.
+STYLESHEETS = {"app": SHARED_CSS, "board": BOARD_CSS, "detail": DETAIL_CSS}
+STYLESHEET_VERSIONS = {
+    name: hashlib.sha256(css.encode()).hexdigest()[:12] for name, css in STYLESHEETS.items()
+}
+
+
+@app.template_global()
+def css_url(name: str) -> str:
+    return f"/css/{name}.css?v={STYLESHEET_VERSIONS[name]}"
+
+
+# Compiled page templates, keyed by source string. render_template_string
+# re-parses and re-compiles its source on every request; these templates are
+# module constants, so each is compiled once and reused.
+_COMPILED_TEMPLATES = {}
+
+
+# Template pieces per chunk when streaming a page (see _render_stream).
+STREAM_BUFFER_ITEMS = 64
+
+
+def _render(source: str, **context) -> str:
+    """render_template_string() with a compile-once cache.
+
+    Keeps Flask's context handling (context processors, request/session/g)
+    by going through app.update_template_context, so templates see exactly
+    what render_template_string gave them."""
+    tpl = _COMPILED_TEMPLATES.get(source)
+    if tpl is None:
+        tpl = _COMPILED_TEMPLATES[source] = app.jinja_env.from_string(source)
+    app.update_template_context(context)
+    return tpl.render(context)
+
+
+def _render_stream(source: str, **context):
+    """Streaming variant of _render() for large pages: the response starts
+    going out while the rest of the template is still rendering. Jinja yields
+    one piece per template node, so pieces are grouped into larger chunks
+    before they reach the socket.
+
+    The context is fully built here, while the request context is active, and
+    the generator runs after the view returns. So the template must not
+    touch request/session/url_for itself; pass values in instead."""
+    tpl = _COMPILED_TEMPLATES.get(source)
+    if tpl is None:
+        tpl = _COMPILED_TEMPLATES[source] = app.jinja_env.from_string(source)
+    app.update_template_context(context)
+    stream = tpl.stream(context)
+    stream.enable_buffering(STREAM_BUFFER_ITEMS)
+    return app.response_class(stream, mimetype="text/html")
+
+
+# Hash of the page template sources (inline JS included), so a deploy that
+# changes a page invalidates browsers' copies even if tasks.json didn't change.
+PAGES_VERSION = hashlib.sha256(
+    "".join((HEADER_HTML, BOARD_HTML, DETAIL_HTML, PROGRESS_HTML)).encode()
+).hexdigest()[:12]
+
+
+def _page_etag(*state) -> str:
+    """ETag for an HTML page: the state it is rendered from plus what every
+    page's shell varies on (signed-in user in the header, stylesheet URLs,
+    the template sources themselves)."""
+    shell = (session.get("username", ""), tuple(STYLESHEET_VERSIONS.values()), PAGES_VERSION)
+    return hashlib.sha1(repr(state + shell).encode()).hexdigest()[:16]
+
+
+def _conditional_page(etag: str, render):
+    """304 if the browser already has this etag, else render() it.
+    private, no-cache: always revalidated, never stored by shared caches."""
+    if request.if_none_match.contains(etag):
+        resp = app.response_class(status=304)
+    else:
+        resp = app.make_response(render())
+    resp.set_etag(etag)
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
+
+
+# Compile every page up front so the first request after a restart doesn't
+# pay for it (and a template syntax error fails at import, not mid-request).
+for _source in (BOARD_HTML, DETAIL_HTML, PROGRESS_HTML, LOG_HTML, LOGIN_HTML):
+    _COMPILED_TEMPLATES[_source] = app.jinja_env.from_string(_source)
+
+
 @app.get("/login")
 @app.post("/login")
 def login():
@@ -1276,7 +1575,21 @@ def login():
         error = "Invalid username or password."
         if not accounts:
             error = "No accounts configured. Run: python3 add_account.py USERNAME ACCOUNT"
-    return render_template_string(LOGIN_HTML, error=error)
+    return _render(LOGIN_HTML, error=error)
+
+
+@app.get("/css/<name>.css")
+def stylesheet(name: str):
+    """Page stylesheets (see STYLESHEETS). Not secret, so served without auth."""
+    css = STYLESHEETS.get(name)
+    if css is None:
+        return "Not found", 404
+    resp = app.response_class(css, mimetype="text/css")
+    resp.set_etag(STYLESHEET_VERSIONS[name])
+    resp.cache_control.public = True
+    resp.cache_control.max_age = 31536000  # URL carries ?v=<hash>
+    resp.cache_control.immutable = True
+    return resp.make_conditional(request)
 
 
 @app.get("/logout")
@@ -1287,15 +1600,28 @@ def logout():
 
 @app.get("/")
 def board():
-    data = load_tasks()
+    """Kanban board. Revalidated by ETag over tasks.json, so a refresh with
+    nothing changed is a 304 with no load or render."""
     show_hidden = request.args.get("show_hidden", "0") == "1"
     acc = session["account"]
-    tasks = [t for t in data["tasks"] if t.get("account", DEFAULT_ACCOUNT) == acc]
-    if not show_hidden:
-        tasks = [t for t in tasks if not t.get("hidden")]
-    return render_template_string(
-        BOARD_HTML, tasks=tasks, pipeline_cols=PIPELINE_COLS, show_hidden=show_hidden,
-        pipeline_cols_json=json.dumps(PIPELINE_COLS),
+    return _conditional_page(
+        _page_etag(tasks_etag(), acc, show_hidden),
+        lambda: _render_board(acc, show_hidden),
+    )
+
+
+def _render_board(acc: str, show_hidden: bool):
+    data = load_tasks()
+    # One pass: filter to this account's visible tasks and bucket them by
+    # status, so each board column renders its list without rescanning.
+    groups = {}
+    for t in data["tasks"]:
+        if t.get("account", DEFAULT_ACCOUNT) != acc or (t.get("hidden") and not show_hidden):
+            continue
+        groups.setdefault(t["status"], []).append(t)
+    return _render_stream(
+        BOARD_HTML, groups=groups, pipeline_cols=PIPELINE_COLS, show_hidden=show_hidden,
+        pipeline_cols_json=PIPELINE_COLS_JSON,
     )
 
 
@@ -1305,19 +1631,13 @@ def add_task():
     This ensures the dispatcher, dependency graph, and web UI never encounter
     missing keys. Uses locked_update + next_id for atomic ID allocation."""
     title = request.form.get("title", "").strip()
+    if not title:
+        return redirect(url_for("board"))  # before any parsing, locking or I/O
     prompt = request.form.get("prompt", "").strip()
-    priority = request.form.get("priority", "medium")
-    plan_model = request.form.get("plan_model", "sonnet")
-    exec_model = request.form.get("exec_model", "sonnet")
+    priority = _form_choice("priority", PRIORITIES, "medium")
+    plan_model = _form_choice("plan_model", MODELS, "sonnet")
+    exec_model = _form_choice("exec_model", MODELS, "sonnet")
     auto_approve = request.form.get("auto_approve") == "1"
-    if priority not in ("high", "medium", "low"):
-        priority = "medium"
-    if plan_model not in ("sonnet", "opus", "haiku"):
-        plan_model = "sonnet"
-    if exec_model not in ("sonnet", "opus", "haiku"):
-        exec_model = "sonnet"
-    if not title:
-        return redirect(url_for("board"))
     if not prompt:
         prompt = title  # agent uses title as description if no detail provided
 
@@ -1344,7 +1664,7 @@ def add_task():
             "unresolved_children": 0,
             "plan": None,
             "report": None,
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": _utc_now_iso(),
             "completed_at": None,
             "summary": None,
             "rejection_comments": [],
@@ -1357,22 +1677,55 @@ def add_task():
     return redirect(url_for("board"))
 
 
+# Rendered detail pages keyed by (task_id, tasks_etag(), username). The page
+# is a pure function of tasks.json plus the header's username, so a refresh
+# with nothing changed is a dict lookup. Small LRU; stale entries simply age out.
+# The dev server is threaded, so LRU bookkeeping happens under the lock;
+# rendering itself does not.
+DETAIL_CACHE_SIZE = 128
+_DETAIL_CACHE: "OrderedDict[tuple, str]" = OrderedDict()
+_DETAIL_CACHE_LOCK = threading.Lock()
+
+
 @app.get("/tasks/<int:task_id>")
 def task_detail(task_id: int):
+    # Version first: a save landing after the load then files this render
+    # under the older version (a harmless miss), never under a newer one.
+    version = tasks_etag()
     task, err = _check_owner(task_id)
     if err:
         return err
-    data = load_tasks()
-    subtasks = [t for t in data["tasks"] if t.get("parent") == task_id]
+
+    def render():
+        key = (task_id, version, session.get("username", ""))
+        with _DETAIL_CACHE_LOCK:
+            html = _DETAIL_CACHE.get(key)
+            if html is not None:
+                _DETAIL_CACHE.move_to_end(key)
+                return html
+        html = _render_task_detail(task_id, task)
+        with _DETAIL_CACHE_LOCK:
+            _DETAIL_CACHE[key] = html
+            while len(_DETAIL_CACHE) > DETAIL_CACHE_SIZE:
+                _DETAIL_CACHE.popitem(last=False)
+        return html
+
+    # Browser revalidation first (304, nothing sent); then the server-side
+    # memo for other viewers/tabs.
+    return _conditional_page(_page_etag(version, task_id), render)
+
+
+def _render_task_detail(task_id: int, task: dict) -> str:
+    subtasks = load_children_index().get(task_id, [])
     plan_parsed = None
     if task.get("plan"):
         try:
-            plan_parsed = json.loads(task["plan"])
+            plan_parsed = _json_loads(task["plan"])
             if not isinstance(plan_parsed, dict) or plan_parsed.get("decision") not in ("execute", "decompose"):
                 plan_parsed = None
         except (json.JSONDecodeError, TypeError):
             plan_parsed = None
-    return render_template_string(DETAIL_HTML, task=task, subtasks=subtasks, plan_parsed=plan_parsed)
+    return _render(DETAIL_HTML, task=task, subtasks=subtasks, plan_parsed=plan_parsed)
 
 
 @app.post("/tasks/<int:task_id>/edit")
@@ -1384,29 +1737,27 @@ def edit_task(task_id: int):
         return err
     title = request.form.get("title", "").strip()
     prompt = request.form.get("prompt", "").strip()
-    priority = request.form.get("priority", "medium")
-    plan_model = request.form.get("plan_model", "sonnet")
-    exec_model = request.form.get("exec_model", "sonnet")
-    if plan_model not in ("sonnet", "opus", "haiku"):
-        plan_model = "sonnet"
-    if exec_model not in ("sonnet", "opus", "haiku"):
-        exec_model = "sonnet"
+    priority = _form_choice("priority", PRIORITIES, "medium")
+    plan_model = _form_choice("plan_model", MODELS, "sonnet")
+    exec_model = _form_choice("exec_model", MODELS, "sonnet")
 
     changed = False
 
     def mutate(data):
         nonlocal changed
-        for t in data["tasks"]:
-            if t["id"] == task_id and t["status"] != "in_progress":
-                if title:
-                    t["title"] = title
-                if prompt:
-                    t["prompt"] = prompt
-                t["priority"] = priority
-                t["plan_model"] = plan_model
-                t["exec_model"] = exec_model
-                changed = True
-                break
+        t = _find_task(data, task_id)
+        if t is None or t["status"] == "in_progress":
+            return False
+        fields = {"priority": priority, "plan_model": plan_model, "exec_model": exec_model}
+        if title:
+            fields["title"] = title
+        if prompt:
+            fields["prompt"] = prompt
+        updates = {k: v for k, v in fields.items() if t.get(k) != v}
+        if not updates:
+            return False
+        t.update(updates)
+        changed = True
 
     locked_update(mutate)
     if changed:
@@ -1419,18 +1770,20 @@ def set_priority(task_id: int):
     _, err = _check_owner(task_id)
     if err:
         return err
-    priority = request.form.get("priority", "medium")
-    if priority not in ("high", "medium", "low"):
-        priority = "medium"
+    priority = _form_choice("priority", PRIORITIES, "medium")
+    changed = False
 
     def mutate(data):
-        for t in data["tasks"]:
-            if t["id"] == task_id:
-                t["priority"] = priority
-                break
+        nonlocal changed
+        t = _find_task(data, task_id)
+        if t is None or t.get("priority") == priority:
+            return False
+        t["priority"] = priority
+        changed = True
 
     locked_update(mutate)
-    log_progress(task_id, "priority changed", priority)
+    if changed:
+        log_progress(task_id, "priority changed", priority)
     return redirect(request.referrer or url_for("board"))
 
 
@@ -1442,10 +1795,10 @@ def set_auto_approve(task_id: int):
     auto_approve = request.form.get("auto_approve") == "1"
 
     def mutate(data):
-        for t in data["tasks"]:
-            if t["id"] == task_id:
-                t["auto_approve"] = auto_approve
-                break
+        t = _find_task(data, task_id)
+        if t is None or t.get("auto_approve") == auto_approve:
+            return False
+        t["auto_approve"] = auto_approve
 
     locked_update(mutate)
     return redirect(url_for("task_detail", task_id=task_id))
@@ -1458,16 +1811,16 @@ def set_model(task_id: int):
         return err
     plan_model = request.form.get("plan_model", "")
     exec_model = request.form.get("exec_model", "")
-    valid = ("sonnet", "opus", "haiku")
 
     def mutate(data):
-        for t in data["tasks"]:
-            if t["id"] == task_id:
-                if plan_model in valid:
-                    t["plan_model"] = plan_model
-                if exec_model in valid:
-                    t["exec_model"] = exec_model
-                break
+        t = _find_task(data, task_id)
+        if t is None:
+            return False
+        updates = {k: v for k, v in (("plan_model", plan_model), ("exec_model", exec_model))
+                   if v in MODELS and t.get(k) != v}
+        if not updates:
+            return False
+        t.update(updates)
 
     locked_update(mutate)
     return redirect(url_for("task_detail", task_id=task_id))
@@ -1485,9 +1838,14 @@ def delete_task(task_id: int):
 
     def mutate(data):
         nonlocal deleted
-        before = len(data["tasks"])
-        data["tasks"] = [t for t in data["tasks"] if t["id"] != task_id or t["status"] == "in_progress"]
-        deleted = len(data["tasks"]) < before
+        tasks = data["tasks"]
+        # Ids are unique: stop at the match and drop it in place rather than
+        # rebuilding the whole list.
+        idx = next((i for i, t in enumerate(tasks) if t["id"] == task_id), None)
+        if idx is None or tasks[idx]["status"] == "in_progress":
+            return False
+        del tasks[idx]
+        deleted = True
 
     locked_update(mutate)
     if deleted:
@@ -1510,14 +1868,14 @@ def approve_task(task_id: int):
         return err
 
     def mutate(data):
-        task = next((t for t in data["tasks"] if t["id"] == task_id), None)
+        task = _find_task(data, task_id)
         if task is None or task["status"] != "plan_review":
-            return
+            return False
 
         decision = {}
         try:
             if task.get("plan"):
-                decision = json.loads(task["plan"])
+                decision = _json_loads(task["plan"])
         except (json.JSONDecodeError, TypeError):
             pass
 
@@ -1525,7 +1883,7 @@ def approve_task(task_id: int):
             subtask_defs = decision.get("subtasks") or []
             n = len(subtask_defs)
             abs_ids = [next_id(data) for _ in range(n)]
-            now = datetime.now(timezone.utc).isoformat()
+            now = _utc_now_iso()
 
             # First pass: create all subtask records
             for i, s in enumerate(subtask_defs):
@@ -1584,20 +1942,20 @@ def reject_task(task_id: int):
     _, err = _check_owner(task_id)
     if err:
         return err
-    feedback = request.form.get("feedback", "").strip()
+    feedback = clip_text(request.form.get("feedback", "").strip())
 
     def mutate(data):
-        for t in data["tasks"]:
-            if t["id"] == task_id and t["status"] == "plan_review":
-                comments = t.get("rejection_comments") or []
-                comments.append({
-                    "round": len(comments) + 1,
-                    "comment": feedback,
-                })
-                t["rejection_comments"] = comments
-                t["status"] = "pending"
-                t["plan"] = None
-                break
+        t = _find_task(data, task_id)
+        if t is None or t["status"] != "plan_review":
+            return False
+        comments = t.get("rejection_comments") or []
+        comments.append({
+            "round": len(comments) + 1,
+            "comment": feedback,
+        })
+        t["rejection_comments"] = comments
+        t["status"] = "pending"
+        t["plan"] = None
 
     locked_update(mutate)
     log_progress(task_id, "plan rejected", feedback or "")
@@ -1613,12 +1971,12 @@ def cancel_task(task_id: int):
     if err:
         return err
     def mutate(data):
-        for t in data["tasks"]:
-            if t["id"] == task_id and t["status"] in ("planning", "executing", "plan_review"):
-                t["status"] = "stopped"
-                t["stop_reason"] = "cancelled"
-                t["summary"] = (t.get("summary") or "") + "\nCancelled by user via Web UI."
-                break
+        t = _find_task(data, task_id)
+        if t is None or t["status"] not in ("planning", "executing", "plan_review"):
+            return False
+        t["status"] = "stopped"
+        t["stop_reason"] = "cancelled"
+        t["summary"] = clip_text((t.get("summary") or "") + "\nCancelled by user via Web UI.")
 
     locked_update(mutate)
     log_progress(task_id, "cancelled by user")
@@ -1636,19 +1994,19 @@ def retry_task(task_id: int):
     if err:
         return err
     def mutate(data):
-        for t in data["tasks"]:
-            if t["id"] == task_id and t["status"] in ("stopped", "done"):
-                t["status"] = "pending"
-                t["completed_at"] = None
-                t["summary"] = None
-                t["result"] = None
-                t["report"] = None
-                t["plan"] = None
-                t["rejection_comments"] = []
-                t["retry_count"] = 0
-                t.pop("stop_reason", None)
-                t.pop("pushed_at", None)
-                break
+        t = _find_task(data, task_id)
+        if t is None or t["status"] not in ("stopped", "done"):
+            return False
+        t["status"] = "pending"
+        t["completed_at"] = None
+        t["summary"] = None
+        t["result"] = None
+        t["report"] = None
+        t["plan"] = None
+        t["rejection_comments"] = []
+        t["retry_count"] = 0
+        t.pop("stop_reason", None)
+        t.pop("pushed_at", None)
 
     locked_update(mutate)
     log_progress(task_id, "requeued (retry)")
@@ -1662,10 +2020,10 @@ def hide_task(task_id: int):
     if err:
         return err
     def mutate(data):
-        for t in data["tasks"]:
-            if t["id"] == task_id:
-                t["hidden"] = True
-                break
+        t = _find_task(data, task_id)
+        if t is None or t.get("hidden"):
+            return False
+        t["hidden"] = True
 
     locked_update(mutate)
     return redirect(url_for("board"))
@@ -1677,10 +2035,10 @@ def unhide_task(task_id: int):
     if err:
         return err
     def mutate(data):
-        for t in data["tasks"]:
-            if t["id"] == task_id:
-                t.pop("hidden", None)
-                break
+        t = _find_task(data, task_id)
+        if t is None or "hidden" not in t:
+            return False
+        del t["hidden"]
 
     locked_update(mutate)
     return redirect(url_for("board", show_hidden="1"))
@@ -1688,35 +2046,55 @@ def unhide_task(task_id: int):
 
 @app.get("/progress")
 def progress():
-    content = ""
-    if PROGRESS_FILE.exists():
-        content = PROGRESS_FILE.read_text()
-    return render_template_string(PROGRESS_HTML, content=content)
+    """Agent progress log. The ETag covers the log file's stat, so revisits
+    revalidate to a 304 without reading or rendering the log."""
+    key = _progress_key()
+    return _conditional_page(
+        _page_etag(key), lambda: _render(PROGRESS_HTML, content=_read_progress(key))
+    )
 
 
 @app.get("/log")
 def git_log():
-    log_output = ""
-    try:
-        result = subprocess.run(
-            ["git", "log", "--oneline", "--graph", "--decorate", "-30"],
-            cwd=str(WORKSPACE),
-            capture_output=True, text=True, timeout=10,
-        )
-        if result.returncode == 0:
-            log_output = result.stdout
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        pass
-    return render_template_string(LOG_HTML, log_output=log_output)
+    return _render(LOG_HTML, log_output=_read_git_log())
 
 
 @app.get("/api/tasks")
 def api_tasks():
-    """Return tasks for the current account + dispatcher status as JSON for live AJAX polling."""
-    data = load_tasks()
+    """Return tasks for the current account + dispatcher status as JSON for live AJAX polling.
+
+    Open board and detail pages poll this every few seconds. The ETag covers
+    tasks.json, the status file and the account, so an unchanged poll is a
+    304 (no load, filter or serialize) and the page JS skips re-rendering
+    when the ETag matches the one it last drew.
+    """
     acc = session["account"]
-    tasks = [t for t in data["tasks"] if t.get("account", DEFAULT_ACCOUNT) == acc]
-    return jsonify({"tasks": tasks, "dispatcher": _read_dispatcher_status()})
+    etag = hashlib.sha1(f"{tasks_etag()}|{_status_etag()}|{acc}".encode()).hexdigest()[:16]
+    if request.if_none_match.contains(etag):
+        resp = app.response_class(status=304)
+    else:
+        data = load_tasks()
+        tasks = [t for t in data["tasks"] if t.get("account", DEFAULT_ACCOUNT) == acc]
+        payload = {"tasks": tasks, "dispatcher": _read_dispatcher_status()}
+        body = orjson.dumps(payload) if orjson is not None else json.dumps(payload)
+        resp = app.response_class(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
+
+
+@app.get("/tasks/export")
+def export_tasks():
+    """This account's tasks as indented JSON, for reading by hand. tasks.json
+    itself is stored compact (see task_store.TASKS_PRETTY)."""
+    acc = session["account"]
+    payload = {"tasks": [t for t in load_tasks()["tasks"] if t.get("account", DEFAULT_ACCOUNT) == acc]}
+    if orjson is not None:
+        body = orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    else:
+        body = json.dumps(payload, indent=2) + "\n"
+    return app.response_class(body, mimetype="application/json")
 
 
 @app.get("/status")
@@ -1725,8 +2103,20 @@ def dispatcher_status():
 
     The dispatcher writes its state to a small JSON file so the Web UI can
     display it.  If the file doesn't exist we report "idle".
+
+    Every page's header fetches this, so the response carries an ETag from the
+    status file's stat (mtime, size) and a 2s private max-age: navigation
+    reuses the browser's copy, and revalidation is a 304 with no body.
     """
-    return jsonify(_read_dispatcher_status())
+    etag = _status_etag()
+    if request.if_none_match.contains(etag):
+        resp = app.response_class(status=304)
+    else:
+        resp = app.response_class(_dispatcher_status_json(), mimetype="application/json")
+    resp.set_etag(etag)
+    resp.cache_control.private = True
+    resp.cache_control.max_age = 2
+    return resp
 
 
 # ---------------------------------------------------------------------------